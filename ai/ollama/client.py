@@ -7,9 +7,14 @@ Provides basic functionality for AI tasks in the expense tracking application.
 
 import json
 import requests
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Union
 from .config import OllamaConfig
 
+# Context window (in tokens) requested for every generation
+NUM_CTX = 36000
+# How long the server keeps the model loaded after a request, so batch runs don't reload it
+KEEP_ALIVE = "30m"
+
 
 class OllamaConnectionError(Exception):
     """Custom exception for connection errors to the Ollama server."""
@@ -26,6 +31,16 @@ class OllamaAPIError(Exception):
     pass
 
 
+# Transport and decoding failures translated into the exceptions above by _translate_error
+_REQUEST_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.HTTPError,
+    requests.exceptions.ChunkedEncodingError,
+    json.JSONDecodeError,
+)
+
+
 class OllamaClient:
     """Simple Ollama client using requests for API calls."""
     
@@ -72,14 +87,28 @@ class OllamaClient:
                 
             return response.json()
             
-        except requests.exceptions.ConnectionError as e:
-            raise OllamaConnectionError(f"Connection to {self.base_url} failed: {e}") from e
-        except requests.exceptions.Timeout as e:
-            raise OllamaTimeoutError(f"Request timed out after {self.config.timeout} seconds") from e
-        except requests.exceptions.HTTPError as e:
-            raise OllamaAPIError(f"HTTP error occurred: {e.response.status_code} - {e.response.text}") from e
-        except json.JSONDecodeError as e:
-            raise OllamaAPIError(f"Invalid JSON response: {e}") from e
+        except _REQUEST_ERRORS as e:
+            raise self._translate_error(e) from e
+    
+    def _translate_error(self, error: Exception) -> Exception:
+        """
+        Map a requests or JSON decoding failure to the matching Ollama exception.
+        
+        Args:
+            error: One of the exceptions listed in _REQUEST_ERRORS
+            
+        Returns:
+            The OllamaConnectionError, OllamaTimeoutError or OllamaAPIError to raise
+        """
+        if isinstance(error, requests.exceptions.ConnectionError):
+            return OllamaConnectionError(f"Connection to {self.base_url} failed: {error}")
+        if isinstance(error, requests.exceptions.Timeout):
+            return OllamaTimeoutError(f"Request timed out after {self.config.timeout} seconds")
+        if isinstance(error, requests.exceptions.HTTPError):
+            return OllamaAPIError(f"HTTP error occurred: {error.response.status_code} - {error.response.text}")
+        if isinstance(error, requests.exceptions.ChunkedEncodingError):
+            return OllamaConnectionError(f"Connection to {self.base_url} was interrupted mid-response: {error}")
+        return OllamaAPIError(f"Invalid JSON response: {error}")
     
     def test_connection(self) -> bool:
         """
@@ -129,7 +158,8 @@ class OllamaClient:
             return False
     
     def generate_completion(self, prompt: str, model: Optional[str] = None, 
-                          stream: bool = False) -> str:
+                          stream: bool = False,
+                          format: Optional[Union[str, Dict[str, Any]]] = None) -> str:
         """
         Generate text completion using Ollama.
         
@@ -137,6 +167,7 @@ class OllamaClient:
             prompt: Input prompt for the model
             model: Model name (uses config.model if None)
             stream: Whether to stream response (not implemented for simplicity)
+            format: "json" or a JSON schema the response must conform to (free text if None)
             
         Returns:
             Generated text response
@@ -144,17 +175,7 @@ class OllamaClient:
         Raises:
             OllamaAPIError: If generation fails
         """
-        model_name = model or self.config.model
-        
-        data = {
-            "model": model_name,
-            "prompt": prompt,
-            "stream": False,  # Keep it simple for now,
-            "think": False,
-            "options": {
-                "num_ctx": 36000,
-            }
-        }
+        data = self._build_generate_payload(prompt, model, stream=False, format=format)
         
         try:
             response = self._execute_request("/api/generate", method="POST", data=data)
@@ -162,6 +183,68 @@ class OllamaClient:
         except (OllamaConnectionError, OllamaTimeoutError, OllamaAPIError) as e:
             raise OllamaAPIError(f"Failed to generate completion: {str(e)}") from e
     
+    def stream_completion(self, prompt: str, model: Optional[str] = None,
+                          format: Optional[Union[str, Dict[str, Any]]] = None) -> Iterator[str]:
+        """
+        Generate text completion using Ollama, yielding fragments as they are produced.
+        
+        Args:
+            prompt: Input prompt for the model
+            model: Model name (uses config.model if None)
+            format: "json" or a JSON schema the response must conform to (free text if None)
+            
+        Yields:
+            Successive fragments of the generated text
+            
+        Raises:
+            OllamaAPIError: If generation fails
+        """
+        url = f"{self.base_url}/api/generate"
+        data = self._build_generate_payload(prompt, model, stream=True, format=format)
+        
+        try:
+            with requests.post(url, json=data, timeout=self.config.timeout, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise OllamaAPIError(f"Failed to stream completion: {chunk['error']}")
+                    yield chunk.get("response", "")
+                    if chunk.get("done"):
+                        break
+        except _REQUEST_ERRORS as e:
+            raise OllamaAPIError(f"Failed to stream completion: {self._translate_error(e)}") from e
+    
+    def _build_generate_payload(self, prompt: str, model: Optional[str], stream: bool,
+                                format: Optional[Union[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Build the request body for the /api/generate endpoint.
+        
+        Args:
+            prompt: Input prompt for the model
+            model: Model name (uses config.model if None)
+            stream: Whether the server should stream the response
+            format: Structured output constraint ("json" or a JSON schema), if any
+            
+        Returns:
+            JSON payload for the generate request
+        """
+        payload = {
+            "model": model or self.config.model,
+            "prompt": prompt,
+            "stream": stream,
+            "think": False,
+            "keep_alive": KEEP_ALIVE,
+            "options": {
+                "num_ctx": NUM_CTX,
+            }
+        }
+        if format is not None:
+            payload["format"] = format
+        return payload
+    
     def categorize_transaction(self, transaction_description: str, 
                              available_categories: List[str]) -> str:
         """
@@ -17,6 +17,7 @@ class OllamaConfig:
     base_url: str = "http://localhost:11434"
     model: str = "llama2"
     timeout: int = 30
+    num_parallel: int = 4
 
 
 @dataclass
@@ -25,6 +26,7 @@ class OllamaSettings:
     base_url: str = "http://localhost:11434"
     model: str = "llama2"
     timeout: int = 30
+    num_parallel: int = 4
     enabled: bool = True
 
 
@@ -110,5 +112,7 @@ class OllamaConfigManager:
         return OllamaConfig(
             base_url=settings.base_url,
             model=settings.model,
-            timeout=settings.timeout
+            timeout=settings.timeout,
+            # A zero or negative value from a hand-edited config would leave no request slots
+            num_parallel=max(1, settings.num_parallel)
         )
\ No newline at end of file
@@ -153,6 +153,10 @@ class DatabaseInterface:
         if 'transaction_date' in df.columns:
             df['transaction_date'] = pd.to_datetime(df['transaction_date'])
         
+        # A handful of category names repeat across every row; categorical columns
+        # store each name once and let grouping by category skip re-hashing strings
+        df = df.astype({'category': 'category', 'sub_category': 'category'})
+        
         return df
     
     # --- Import methods (pandas to DB) ---
@@ -189,19 +193,29 @@ class DatabaseInterface:
                 # Prepare transaction data for batch operation
                 transactions_data = []
                 categories_to_create = []
+                # Statements repeat the same dates many times; each distinct value is converted once
+                converted_dates: Dict[object, datetime.datetime] = {}
                 
                 for index, row in df.iterrows():
                     try:
-                        # Convert transaction_date to datetime if needed
-                        transaction_date = row['transaction_date']
-                        if isinstance(transaction_date, str):
-                            transaction_date = pd.to_datetime(transaction_date).to_pydatetime()
-                        elif isinstance(transaction_date, pd.Timestamp):
-                            transaction_date = transaction_date.to_pydatetime()
-                        
-                        # Ensure timezone awareness
-                        if transaction_date.tzinfo is None:
-                            transaction_date = indian_timezone.localize(transaction_date)
+                        raw_date = row['transaction_date']
+                        transaction_date = converted_dates.get(raw_date)
+                        if transaction_date is None:
+                            # Convert transaction_date to datetime if needed
+                            transaction_date = raw_date
+                            if isinstance(transaction_date, str):
+                                try:
+                                    # ISO dates, the processors' output format, skip pandas' parser
+                                    transaction_date = datetime.datetime.fromisoformat(transaction_date)
+                                except ValueError:
+                                    transaction_date = pd.to_datetime(transaction_date).to_pydatetime()
+                            elif isinstance(transaction_date, pd.Timestamp):
+                                transaction_date = transaction_date.to_pydatetime()
+                            
+                            # Ensure timezone awareness
+                            if transaction_date.tzinfo is None:
+                                transaction_date = indian_timezone.localize(transaction_date)
+                            converted_dates[raw_date] = transaction_date
                         
                         # Resolve category_id from category and sub_category names
                         category_id = self._resolve_category_id(
@@ -238,8 +252,6 @@ class DatabaseInterface:
                         }
                         transactions_data.append(transaction_data)
                         
-                        print(f"DEBUG: Prepared transaction {index}: {row.get('description', 'No description')} - ${row['amount']}")
-                        
                     except Exception as e:
                         print(f"ERROR: Failed to prepare transaction at row {index}: {str(e)}")
                         print(f"ERROR: Row data: {row.to_dict()}")
@@ -220,7 +220,8 @@ class Database:
         print(f"DEBUG: Creating batch of {len(transactions_data)} transactions")
         
         try:
-            for i, data in enumerate(transactions_data):
+            # Progress is reported once per batch below, not per row
+            for data in transactions_data:
                 db_transaction = model.Transaction(
                     amount=data['amount'],
                     transaction_date=data['transaction_date'],
@@ -230,7 +231,6 @@ class Database:
                 )
                 db.add(db_transaction)
                 created_transactions.append(db_transaction)
-                print(f"DEBUG: Added transaction {i+1}/{len(transactions_data)} to batch")
             
             # Only commit if we're managing our own session
             if session is None:
@@ -281,7 +281,8 @@ class Database:
         print(f"DEBUG: Creating batch of {len(categories_data)} categories")
         
         try:
-            for i, data in enumerate(categories_data):
+            # Progress is reported once per batch below, not per row
+            for data in categories_data:
                 db_category = model.Category(
                     name=data['name'],
                     parent_id=data.get('parent_id'),
@@ -289,7 +290,6 @@ class Database:
                 )
                 db.add(db_category)
                 created_categories.append(db_category)
-                print(f"DEBUG: Added category {i+1}/{len(categories_data)} to batch: '{data['name']}'")
             
             # Only commit if we're managing our own session
             if session is None:
@@ -10,14 +10,79 @@ Chosen Library: pdfplumber
 - It robustly handles text, tables, and encrypted files, making it the ideal choice for this project's requirements.
 """
 import io
+import mmap
+import multiprocessing
+import os
 import pandas as pd
-import pdfplumber
-from typing import Union, Optional
-from pdfminer.pdfdocument import PDFPasswordIncorrect
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+from typing import Union, Optional, Iterable, Iterator, List
 
 # Define a specific type for the file source for clarity and correctness.
 T_FileSource = Union[str, io.BytesIO]
 
+# Number of trailing bytes searched for `/Encrypt` when a PDF has no classic trailer.
+_TRAILER_SCAN_WINDOW = 8192
+
+# Statements with at least this many pages have their tables extracted by a process pool.
+PARALLEL_PAGE_THRESHOLD = 16
+MAX_PAGE_WORKERS = 4
+
+@lru_cache(maxsize=1)
+def _get_pdfplumber():
+    """
+    Imports pdfplumber (and pdfminer's password error) on first use only.
+
+    The pdfminer import tree is expensive, so it is deferred until a PDF is
+    actually parsed rather than paid on every import of this module.
+
+    Returns:
+        A tuple of the pdfplumber module and the PDFPasswordIncorrect exception.
+    """
+    import pdfplumber
+    from pdfminer.pdfdocument import PDFPasswordIncorrect
+    return pdfplumber, PDFPasswordIncorrect
+
+def _iter_table_rows(pages: Iterable) -> Iterator[List[Optional[str]]]:
+    """
+    Yields the table rows of the given pages, skipping rows with no content in
+    any cell so pandas never sees them.
+    """
+    for page in pages:
+        for table in page.extract_tables():
+            for row in table:
+                if any(cell is not None and cell != '' for cell in row):
+                    yield row
+
+def _page_worker_count(page_count: int) -> int:
+    """
+    Returns how many worker processes to use for a statement of `page_count` pages.
+
+    Only the CPUs this process may actually run on (affinity and cgroup
+    limits) are counted; a result of 1 means the pages are extracted in-process.
+    """
+    if page_count < PARALLEL_PAGE_THRESHOLD:
+        return 1
+    return min(MAX_PAGE_WORKERS, os.process_cpu_count() or 1, page_count)
+
+def _extract_page_range_rows(shm_name: str, size: int, password: Optional[str], start: int, stop: int) -> List[List[Optional[str]]]:
+    """
+    Process-pool worker: extracts table rows from pages [start, stop).
+
+    The PDF bytes are read from a shared memory block created by the parent,
+    so only the block's name crosses the process boundary.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    try:
+        pdf_bytes = io.BytesIO(bytes(shm.buf[:size]))
+    finally:
+        shm.close()
+
+    pdfplumber, _ = _get_pdfplumber()
+    with pdfplumber.open(pdf_bytes, password=password) as pdf:
+        return list(_iter_table_rows(pdf.pages[start:stop]))
+
 class PDFParser:
     """
     Parses a PDF file, handling encryption and extracting transaction data.
@@ -36,6 +101,42 @@ class PDFParser:
         self.file_source = file_source
         self.password = password
 
+    def _read_bytes(self) -> bytes:
+        """Returns the raw bytes of the PDF source."""
+        if isinstance(self.file_source, io.BytesIO):
+            return self.file_source.getvalue()
+        with open(self.file_source, "rb") as f:
+            return f.read()
+
+    def _extract_rows_in_parallel(self, page_count: int, workers: int) -> Iterator[List[Optional[str]]]:
+        """
+        Extracts table rows from contiguous page ranges in a process pool.
+
+        The PDF bytes are placed in shared memory once and every worker attaches
+        to that block, instead of each worker receiving its own pickled copy.
+        Each worker still opens the document itself, which is why only long
+        statements take this path. Workers are spawned rather than forked, as
+        forking the multi-threaded Streamlit server can deadlock the child.
+        Rows are yielded in page order.
+        """
+        pdf_bytes = self._read_bytes()
+        pages_per_worker = -(-page_count // workers)
+        page_ranges = [(start, min(start + pages_per_worker, page_count)) for start in range(0, page_count, pages_per_worker)]
+
+        shm = shared_memory.SharedMemory(create=True, size=len(pdf_bytes))
+        try:
+            shm.buf[:len(pdf_bytes)] = pdf_bytes
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = [
+                    executor.submit(_extract_page_range_rows, shm.name, len(pdf_bytes), self.password, start, stop)
+                    for start, stop in page_ranges
+                ]
+                for future in futures:
+                    yield from future.result()
+        finally:
+            shm.close()
+            shm.unlink()
+
     def parse(self) -> pd.DataFrame:
         """
         Extracts all tables from the PDF and returns a raw DataFrame.
@@ -51,25 +152,22 @@ class PDFParser:
         """
         if isinstance(self.file_source, io.BytesIO):
             self.file_source.seek(0)
-            
+
+        pdfplumber, PDFPasswordIncorrect = _get_pdfplumber()
         try:
             with pdfplumber.open(self.file_source, password=self.password) as pdf:
                 if not pdf.pages:
                     raise ValueError("PDF is encrypted and requires a password, but none was provided.")
 
-                all_rows = []
-                for page in pdf.pages:
-                    tables = page.extract_tables()
-                    for table in tables:
-                        all_rows.extend(table)
-                
-                if not all_rows:
-                    raise ValueError("No transaction data could be found in the PDF.")
-                
+                page_count = len(pdf.pages)
+                workers = _page_worker_count(page_count)
+                if workers > 1:
+                    rows = self._extract_rows_in_parallel(page_count, workers)
+                else:
+                    rows = _iter_table_rows(pdf.pages)
+
                 # Create a raw DataFrame without assuming a header
-                df = pd.DataFrame(all_rows)
-                df.dropna(how='all', inplace=True)
-                
+                df = pd.DataFrame.from_records(rows)
                 if df.empty:
                     raise ValueError("No transaction data could be found in the PDF.")
                 
@@ -80,21 +178,67 @@ class PDFParser:
         except Exception as e:
             raise ValueError(f"Could not parse the PDF file. It may be corrupted: {e}")
 
+def _scan_for_encrypt_marker(data) -> Optional[bool]:
+    """
+    Looks for the `/Encrypt` key in the PDF trailer using a raw byte scan.
+
+    Per the PDF spec, the trailer carries an Encrypt dictionary if and only if
+    the document is encrypted, so this avoids parsing the object tree.
+
+    Args:
+        data: The raw PDF bytes (a bytes object or a read-only mmap).
+
+    Returns:
+        True or False when the scan is conclusive, or None when no classic
+        trailer exists (e.g. cross-reference streams) and no marker was seen.
+    """
+    trailer_pos = data.rfind(b"trailer")
+    if trailer_pos != -1:
+        trailer_end = data.find(b"startxref", trailer_pos)
+        if trailer_end == -1:
+            trailer_end = len(data)
+        return data.find(b"/Encrypt", trailer_pos, trailer_end) != -1
+
+    # Without a trailer keyword the Encrypt key lives in the xref stream
+    # dictionary, which writers place near the end of the file.
+    if data.find(b"/Encrypt", max(0, len(data) - _TRAILER_SCAN_WINDOW)) != -1:
+        return True
+    return None
+
+
 def is_pdf_encrypted(file_source: T_FileSource) -> bool:
     """
-    Checks if a PDF file is encrypted without performing a full parse.
+    Checks if a PDF file requires a password to be opened.
+
+    A byte scan of the trailer rules out unencrypted files without a parse.
+    When it finds an Encrypt dictionary (or is inconclusive), pdfplumber
+    confirms by opening the file with an empty password, since PDFs protected
+    only by an owner password open without one.
 
     Args:
         file_source: A file path or a standard in-memory binary stream.
 
     Returns:
-        True if the PDF is encrypted, False otherwise.
+        True if the PDF needs a password, False otherwise.
     """
+    try:
+        if isinstance(file_source, io.BytesIO):
+            has_encrypt_marker = _scan_for_encrypt_marker(file_source.getvalue())
+        else:
+            with open(file_source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                has_encrypt_marker = _scan_for_encrypt_marker(data)
+    except (OSError, ValueError):
+        has_encrypt_marker = None
+
+    if has_encrypt_marker is False:
+        return False
+
     if isinstance(file_source, io.BytesIO):
         file_source.seek(0)
 
+    pdfplumber, _ = _get_pdfplumber()
     try:
-        with pdfplumber.open(file_source) as pdf:
+        with pdfplumber.open(file_source, password="") as pdf:
             is_encrypted = not pdf.pages
         
         if isinstance(file_source, io.BytesIO):
@@ -5,7 +5,7 @@ This module contains the core components that ensure any data processor, whether
 rule-based or AI-driven, adheres to a standard interface and output schema.
 
 Key Components:
-- AbstractDataProcessor: An abstract base class that all processors must implement.
+- AbstractDataProcessor: An abstract base class that all processors must implement via `_process_impl`.
 - StandardTransaction: A Pydantic model defining the required data structure for a single transaction record.
 - @enforce_output_schema: A decorator that guarantees the final output DataFrame from any processor conforms to the application-wide standard.
 """
@@ -15,7 +15,7 @@ from abc import ABC, abstractmethod
 from pydantic import BaseModel
 from datetime import date
 from functools import wraps
-from typing import List
+from typing import Callable, List, Optional
 
 # --- Level 1: Content Validation Schema (Pydantic) ---
 
@@ -53,28 +53,27 @@ def enforce_output_schema(func):
             'description', 'amount', 'transaction_date', 'category', 'sub_category'
         ]
         
-        # Call the actual processor method (e.g., AIDataProcessor.process_raw_data)
+        # Call the actual processor method (e.g., AbstractDataProcessor.process_raw_data)
         processed_df = func(*args, **kwargs)
 
         if not isinstance(processed_df, pd.DataFrame):
             raise ValueError("Processor did not return a pandas DataFrame.")
 
-        # Create a new DataFrame with the standard columns
-        final_df = pd.DataFrame()
-        
         # 1. Enforce Column Existence and Order
-        for col in db_interface_columns:
-            if col not in processed_df.columns:
-                raise ValueError(f"Processed DataFrame is missing required column: '{col}'")
-            final_df[col] = processed_df[col]
-            
+        missing_columns = [col for col in db_interface_columns if col not in processed_df.columns]
+        if missing_columns:
+            raise ValueError(f"Processed DataFrame is missing required column: '{missing_columns[0]}'")
+
+        # Select the standard columns in one pass rather than assigning them one by one;
+        # a list selection already returns a new frame, so no extra copy is taken
+        final_df = processed_df.loc[:, db_interface_columns]
+
         # 2. Enforce Data Types
         try:
-            final_df['transaction_date'] = pd.to_datetime(final_df['transaction_date'])
+            # Processors emit ISO dates, so skip pandas' per-call format inference
+            final_df['transaction_date'] = pd.to_datetime(final_df['transaction_date'], format='ISO8601')
             final_df['amount'] = pd.to_numeric(final_df['amount'])
-            final_df['description'] = final_df['description'].astype(str)
-            final_df['category'] = final_df['category'].astype(str)
-            final_df['sub_category'] = final_df['sub_category'].astype(str)
+            final_df = final_df.astype({'description': str, 'category': str, 'sub_category': str})
         except Exception as e:
             raise ValueError(f"Failed to enforce data types on the processed DataFrame: {e}")
 
@@ -88,24 +87,39 @@ class AbstractDataProcessor(ABC):
     """
     Abstract base class for all data processors.
     
-    It defines the single `process_raw_data` method that all concrete
-    processor implementations (e.g., RuleBased, AI-driven) must provide.
+    It provides the public `process_raw_data` template method and defines the
+    `_process_impl` hook that all concrete processor implementations
+    (e.g., RuleBased, AI-driven) must provide.
     """
     
-    @abstractmethod
     @enforce_output_schema
-    def process_raw_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def process_raw_data(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
         """
         Processes a raw DataFrame and returns a standardized DataFrame.
         
-        This method is decorated with `@enforce_output_schema` to guarantee
-        that the final output is always compliant with the application's
-        data contract.
+        This method delegates to the processor-specific `_process_impl` and is
+        decorated with `@enforce_output_schema`, so every processor's output is
+        conformed to the application's data contract exactly once.
 
         Args:
             df: A raw pandas DataFrame from a file parser.
+            on_progress: Optional callback receiving a progress fraction and a status message.
 
         Returns:
             A standardized pandas DataFrame with a guaranteed schema.
         """
+        return self._process_impl(df, on_progress)
+
+    @abstractmethod
+    def _process_impl(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
+        """
+        Performs the processor-specific transformation of a raw DataFrame.
+
+        Args:
+            df: A raw pandas DataFrame from a file parser.
+            on_progress: Optional callback receiving a progress fraction and a status message.
+
+        Returns:
+            A DataFrame containing at least the standard columns.
+        """
         pass
@@ -9,24 +9,123 @@ relying on hard-coded rules.
 
 import pandas as pd
 import json
-from pydantic import ValidationError
-from typing import Dict, List, Optional, Callable
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable
 import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 
+from ai.ollama.client import NUM_CTX, OllamaClient
 from ai.ollama.factory import get_ollama_client
 from core.database.db_interface import DatabaseInterface
-from .abstract_processor import AbstractDataProcessor, StandardTransaction, enforce_output_schema
+from .abstract_processor import AbstractDataProcessor, StandardTransaction
+from .utils import DATE_SAMPLE_SIZE, DebugColors, infer_date_format, to_delimited_text, write_debug_block
 
 # Configurable parameters for batch processing
-BATCH_SIZE = 15
+MIN_BATCH_SIZE = 5
+MAX_BATCH_SIZE = 200
 MAX_RETRIES = 1
-DATE_SAMPLE_SIZE = 20
+# Rough token accounting used to fit each batch into the model's context window
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_PER_ROW = 60
 
-# ANSI color codes for debug printing
-class DebugColors:
-    PROMPT = '\033[94m'  # Blue
-    LLM_OUTPUT = '\033[93m'  # Yellow
-    ENDC = '\033[0m'
+_JSON_DECODER = json.JSONDecoder()
+
+# Structured output schema sent with each batch so the model can only emit a transaction array
+_BATCH_RESPONSE_SCHEMA = TypeAdapter(List[StandardTransaction]).json_schema()
+
+@lru_cache(maxsize=8)
+def _llm_prompt_prefix(category_json_string: str, date_format_string: str) -> str:
+    """
+    Builds the static part of the batch prompt that precedes the raw data.
+
+    It only depends on the category hierarchy and the date format, so it is
+    assembled once per combination and reused for every batch.
+    """
+    return f"""
+        You are an expert financial data extraction and categorization AI. Your task is to analyze the following raw transaction data and convert it into a structured JSON output.
+
+        Follow these instructions precisely:
+        1.  Extract the transaction description, date, and amount.
+        2.  The 'description' MUST be the original description from the raw data.
+        3.  The 'transaction_date' MUST be in 'YYYY-MM-DD' format. The raw date format is '{date_format_string}'. You must convert it correctly.
+        4.  The 'amount' must be a number. Credits are positive, debits are negative.
+        5.  Assign a 'category' and 'sub_category' from the provided hierarchy.
+        6.  If a transaction clearly fits a parent category but not a specific sub-category, you may leave the 'sub_category' blank.
+        7.  If no suitable category is found, assign 'category' to 'Other' and leave 'sub_category' blank.
+        8.  Return a single, valid JSON array of objects. Do not include any other text.
+        **You should not split a single row into multiple objects. Each row in the input should correspond to a single object in the output. All columns represeting closing balance should be ignored**
+        Here is the category hierarchy to use:
+        ```json
+        {category_json_string}
+        ```
+
+        Raw Data:
+        ---
+        """
+
+_LLM_PROMPT_SUFFIX = """
+        ---
+
+        Respond with only the JSON array with each json object having below fields:
+            "transaction_date" - this should be strcitly in YYYY-MM-DD format,
+            "description",
+            "amount" - positve for credits and negative for debits,
+            "category",
+            "sub_category"
+        """
+
+def _iter_json_array_items(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Incrementally parses a streamed JSON array, yielding each element as soon
+    as it is complete. Any text before the opening bracket (e.g. a code fence)
+    is skipped.
+
+    Raises:
+        ValueError: If the stream holds no JSON array or ends before it is closed.
+    """
+    buffer = ''
+    in_array = False
+
+    def drain(final: bool) -> Iterator[Any]:
+        nonlocal buffer, in_array
+        pos = 0
+        if not in_array:
+            start = buffer.find('[')
+            if start == -1:
+                return
+            if '{' in buffer[:start]:
+                raise ValueError("LLM did not return a JSON array.")
+            in_array = True
+            pos = start + 1
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] == ']':
+                break
+            try:
+                item, end = _JSON_DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise ValueError("LLM returned a malformed JSON array.")
+                break
+            # A value touching the end of the buffer (e.g. a number) may still be growing
+            if end == len(buffer) and not final:
+                break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+
+    for chunk in chunks:
+        buffer += chunk
+        yield from drain(final=False)
+    yield from drain(final=True)
+
+    if not in_array:
+        raise ValueError("LLM did not return a JSON array.")
+    if not buffer.startswith(']'):
+        raise ValueError("LLM returned an incomplete JSON array.")
 
 class AIDataProcessor(AbstractDataProcessor):
     """
@@ -34,6 +133,9 @@ class AIDataProcessor(AbstractDataProcessor):
     standardized format. It follows the contract defined by AbstractDataProcessor.
     """
 
+    # Built once and reused so each streamed record skips model introspection
+    _TRANSACTION_ADAPTER = TypeAdapter(StandardTransaction)
+
     def __init__(self, debug: bool = False):
         """
         Initializes the AI Data Processor.
@@ -43,6 +145,35 @@ class AIDataProcessor(AbstractDataProcessor):
         """
         self.db_interface = DatabaseInterface()
         self._debug = debug
+        self._ollama_client: Optional[OllamaClient] = None
+        self._category_json: Optional[str] = None
+
+    def _get_ollama_client(self) -> OllamaClient:
+        """Returns the Ollama client, fetching it from the factory on first use."""
+        if self._ollama_client is None:
+            self._ollama_client = get_ollama_client()
+        return self._ollama_client
+
+    def _get_num_parallel(self) -> int:
+        """Returns the configured number of parallel request slots, never less than one."""
+        return max(1, self._get_ollama_client().config.num_parallel)
+
+    def _get_category_json(self) -> str:
+        """
+        Returns the category hierarchy serialized for the LLM prompt.
+
+        Categories rarely change, so the hierarchy is read from the database and
+        serialized once, then reused until `refresh_categories` is called.
+        """
+        if self._category_json is None:
+            categories_df = self.db_interface.get_categories_table()
+            category_hierarchy = self._prepare_category_prompt_data(categories_df)
+            self._category_json = orjson.dumps(category_hierarchy, option=orjson.OPT_INDENT_2).decode()
+        return self._category_json
+
+    def refresh_categories(self) -> None:
+        """Discards the cached category hierarchy so it is reloaded on the next run."""
+        self._category_json = None
 
     def _prepare_category_prompt_data(self, categories_df: pd.DataFrame) -> Dict[str, List[str]]:
         """
@@ -54,21 +185,16 @@ class AIDataProcessor(AbstractDataProcessor):
         Returns:
             A dictionary where keys are parent categories and values are lists of their sub-categories.
         """
-        hierarchy = {}
-        parent_categories = categories_df[categories_df['parent_category'].isnull()]['name'].unique()
-        for parent in parent_categories:
-            hierarchy[parent] = []
-        
-        for _, row in categories_df.iterrows():
-            if pd.notna(row['parent_category']) and row['parent_category'] in hierarchy:
-                hierarchy[row['parent_category']].append(row['name'])
-        return hierarchy
+        has_parent = categories_df['parent_category'].notna()
+        children = categories_df[has_parent].groupby('parent_category', sort=False)['name'].agg(list).to_dict()
+        parent_categories = categories_df[~has_parent]['name'].unique()
+        return {parent: children.get(parent, []) for parent in parent_categories}
 
     def _discover_date_format(self, df_sample: pd.DataFrame) -> str:
         """
         Pass 1: Asks the LLM to identify the date format string.
         """
-        sample_text = df_sample.to_csv(index=False)
+        sample_text = to_delimited_text(df_sample)
         
         prompt = f"""
         You are a date format expert. Your task is to analyze the following sample data and identify the Python strftime format string for the date column.
@@ -85,9 +211,9 @@ class AIDataProcessor(AbstractDataProcessor):
         """
         
         if self._debug:
-            print(f"\n{DebugColors.PROMPT}{'='*50}\n[DATE DISCOVERY PROMPT]\n{'='*50}\n{prompt}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.PROMPT, "[DATE DISCOVERY PROMPT]", prompt)
         
-        ollama_client = get_ollama_client()
+        ollama_client = self._get_ollama_client()
         response = ollama_client.generate_completion(prompt).strip()
         
         if not response.startswith('%'):
@@ -96,86 +222,94 @@ class AIDataProcessor(AbstractDataProcessor):
         print(f"Discovered date format: {response}")
         return response
 
-    def _create_llm_prompt(self, df_text: str, category_hierarchy: Dict[str, List[str]], date_format_string: str) -> str:
+    def _create_llm_prompt(self, df_text: str, category_json_string: str, date_format_string: str) -> str:
         """
         Engineers a detailed prompt for the LLM, including the category hierarchy and date format.
         Args:
-            df_text: The raw transaction data serialized as a CSV string.
-            category_hierarchy: A hierarchical dictionary of categories.
+            df_text: The raw transaction data serialized as tab-separated text.
+            category_json_string: The category hierarchy serialized as JSON.
+            date_format_string: The strftime format of the raw dates.
 
         Returns:
             A string containing the full prompt for the LLM.
         """
-        category_json_string = json.dumps(category_hierarchy, indent=2)
-
-        return f"""
-        You are an expert financial data extraction and categorization AI. Your task is to analyze the following raw transaction data and convert it into a structured JSON output.
-
-        Follow these instructions precisely:
-        1.  Extract the transaction description, date, and amount.
-        2.  The 'description' MUST be the original description from the raw data.
-        3.  The 'transaction_date' MUST be in 'YYYY-MM-DD' format. The raw date format is '{date_format_string}'. You must convert it correctly.
-        4.  The 'amount' must be a number. Credits are positive, debits are negative.
-        5.  Assign a 'category' and 'sub_category' from the provided hierarchy.
-        6.  If a transaction clearly fits a parent category but not a specific sub-category, you may leave the 'sub_category' blank.
-        7.  If no suitable category is found, assign 'category' to 'Other' and leave 'sub_category' blank.
-        8.  Return a single, valid JSON array of objects. Do not include any other text.
-        **You should not split a single row into multiple objects. Each row in the input should correspond to a single object in the output. All columns represeting closing balance should be ignored**
-        Here is the category hierarchy to use:
-        ```json
-        {category_json_string}
-        ```
-
-        Raw Data:
-        ---
-        {df_text}
-        ---
-
-        Respond with only the JSON array with each json object having below fields:
-            "transaction_date" - this should be strcitly in YYYY-MM-DD format,
-            "description",
-            "amount" - positve for credits and negative for debits,
-            "category",
-            "sub_category"
-        """
+        prefix = _llm_prompt_prefix(category_json_string, date_format_string)
+        return prefix + df_text + _LLM_PROMPT_SUFFIX
 
-    def _process_batch(self, batch_df: pd.DataFrame, category_hierarchy: Dict[str, List[str]], date_format_string: str) -> List[Dict]:
+    def _process_batch(self, batch_df: pd.DataFrame, category_json_string: str, date_format_string: str) -> List[Dict]:
         """
         Processes a single batch of data using the LLM.
         """
-        data_text = batch_df.to_csv(index=False)
-        prompt = self._create_llm_prompt(data_text, category_hierarchy, date_format_string)
+        data_text = to_delimited_text(batch_df)
+        prompt = self._create_llm_prompt(data_text, category_json_string, date_format_string)
         if self._debug:
-            print(f"\n{DebugColors.PROMPT}{'='*50}\n[PROCESSING PROMPT - BATCH]\n{'='*50}\n{prompt}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.PROMPT, "[PROCESSING PROMPT - BATCH]", prompt)
         
-        ollama_client = get_ollama_client()
-        llm_response = ollama_client.generate_completion(prompt)
+        ollama_client = self._get_ollama_client()
+        response_chunks: List[str] = []
+
+        def record_chunks(chunks: Iterator[str]) -> Iterator[str]:
+            for chunk in chunks:
+                response_chunks.append(chunk)
+                yield chunk
 
+        chunks = ollama_client.stream_completion(prompt, format=_BATCH_RESPONSE_SCHEMA)
         if self._debug:
-            print(f"\n{DebugColors.LLM_OUTPUT}{'='*50}\n[LLM RAW OUTPUT - BATCH]\n{'='*50}\n{llm_response}{DebugColors.ENDC}")
-        
-        if llm_response.startswith("```json"):
-            llm_response = llm_response[8:].strip()
-        if llm_response.endswith("```"):
-            llm_response = llm_response[:-3].strip()
-            
-        parsed_json = json.loads(llm_response)
-        if not isinstance(parsed_json, list):
-            raise ValueError("LLM did not return a JSON array.")
+            chunks = record_chunks(chunks)
 
+        # Records are validated as soon as the LLM closes each JSON object,
+        # overlapping validation with the rest of the generation.
         validated_records = []
-        for record in parsed_json:
-            try:
-                validated_transaction = StandardTransaction(**record)
-                validated_records.append(validated_transaction.model_dump())
-            except ValidationError as e:
-                print(f"Skipping a record due to validation error: {e}")
-                continue
-        
+        try:
+            for record in _iter_json_array_items(chunks):
+                try:
+                    transaction = self._TRANSACTION_ADAPTER.validate_python(record)
+                    validated_records.append(self._TRANSACTION_ADAPTER.dump_python(transaction))
+                except ValidationError as e:
+                    print(f"Skipping a record due to validation error: {e}")
+                    continue
+        finally:
+            if self._debug:
+                write_debug_block(DebugColors.LLM_OUTPUT, "[LLM RAW OUTPUT - BATCH]", *response_chunks)
+
         return validated_records
 
-    @enforce_output_schema
-    def process_raw_data(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
+    def _process_batch_with_retries(self, batch_df: pd.DataFrame, category_json_string: str, date_format_string: str, batch_number: int) -> Optional[List[Dict]]:
+        """
+        Processes a single batch, retrying up to MAX_RETRIES times on failure.
+
+        Returns:
+            The validated records, or None if every attempt failed.
+        """
+        for attempt in range(1, MAX_RETRIES + 2):
+            try:
+                return self._process_batch(batch_df, category_json_string, date_format_string)
+            except Exception as e:
+                print(f"Error processing batch {batch_number}, attempt {attempt}/{MAX_RETRIES+1}: {e}")
+        return None
+
+    def _compute_batch_size(self, df: pd.DataFrame, category_json_string: str, date_format_string: str) -> int:
+        """
+        Sizes batches to fill the model's context window instead of using a fixed row count.
+
+        The token cost of a row (its raw text plus the JSON record generated for it)
+        is estimated from a sample, and as many rows are packed per batch as fit
+        beside the fixed prompt. Batches are also kept small enough that every
+        parallel request slot receives one.
+
+        Returns:
+            The number of rows per batch, between MIN_BATCH_SIZE and MAX_BATCH_SIZE.
+        """
+        sample_df = df.head(DATE_SAMPLE_SIZE)
+        row_chars = len(to_delimited_text(sample_df)) / len(sample_df)
+        tokens_per_row = row_chars / CHARS_PER_TOKEN + OUTPUT_TOKENS_PER_ROW
+        prompt_tokens = len(self._create_llm_prompt('', category_json_string, date_format_string)) / CHARS_PER_TOKEN
+
+        batch_size = int((NUM_CTX - prompt_tokens) // tokens_per_row)
+        rows_per_slot = math.ceil(len(df) / self._get_num_parallel())
+        return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, batch_size, rows_per_slot))
+
+    def _process_impl(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
         """
         Processes a raw DataFrame using a two-pass model to ensure accurate date handling.
         """
@@ -187,45 +321,53 @@ class AIDataProcessor(AbstractDataProcessor):
             on_progress(0.0, "Discovering date format...")
         try:
             sample_df = df.head(DATE_SAMPLE_SIZE)
-            date_format_string = self._discover_date_format(sample_df)
+            # Only ask the LLM when the format cannot be settled locally
+            date_format_string = infer_date_format(sample_df)
+            if date_format_string is None:
+                date_format_string = self._discover_date_format(sample_df)
+            else:
+                print(f"Inferred date format: {date_format_string}")
         except Exception as e:
             raise ValueError(f"Failed to discover date format: {e}")
 
         # --- Pass 2: Batch Processing ---
-        categories_df = self.db_interface.get_categories_table()
-        category_hierarchy = self._prepare_category_prompt_data(categories_df)
+        category_json_string = self._get_category_json()
         
-        all_results = []
-        num_batches = math.ceil(len(df) / BATCH_SIZE)
+        batch_size = self._compute_batch_size(df, category_json_string, date_format_string)
+        num_batches = math.ceil(len(df) / batch_size)
+        batches = [df.iloc[i * batch_size:(i + 1) * batch_size] for i in range(num_batches)]
+        batch_results: List[List[Dict]] = [[] for _ in batches]
 
-        for i in range(num_batches):
-            batch_start = i * BATCH_SIZE
-            batch_end = batch_start + BATCH_SIZE
-            batch_df = df.iloc[batch_start:batch_end]
-            
-            retries = 0
-            while retries <= MAX_RETRIES:
-                try:
-                    validated_records = self._process_batch(batch_df, category_hierarchy, date_format_string)
-                    all_results.extend(validated_records)
-                    
-                    if on_progress:
-                        progress = 0.05 + (((i + 1) / num_batches) * 0.95)
+        # LLM latency is dominated by generation time, so batches are sent concurrently,
+        # bounded by the number of requests the Ollama server is configured to run in parallel
+        max_workers = min(num_batches, self._get_num_parallel())
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._process_batch_with_retries, batch_df, category_json_string, date_format_string, i + 1): i
+                for i, batch_df in enumerate(batches)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                validated_records = future.result()
+                if validated_records is not None:
+                    batch_results[i] = validated_records
+
+                if on_progress:
+                    progress = 0.05 + ((completed / num_batches) * 0.95)
+                    if validated_records is not None:
                         on_progress(progress, f"Successfully processed batch {i+1}/{num_batches}")
-                    
-                    break
-                
-                except Exception as e:
-                    retries += 1
-                    print(f"Error processing batch {i+1}, attempt {retries}/{MAX_RETRIES+1}: {e}")
-                    if retries > MAX_RETRIES:
-                        if on_progress:
-                            progress = 0.05 + (((i + 1) / num_batches) * 0.95)
-                            on_progress(progress, f"Failed to process batch {i+1} after {MAX_RETRIES} retries. Skipping.")
-                        break
+                    else:
+                        on_progress(progress, f"Failed to process batch {i+1} after {MAX_RETRIES} retries. Skipping.")
+
+        # Reassemble in input order regardless of completion order
+        all_results = [record for records in batch_results for record in records]
 
         if not all_results:
             return pd.DataFrame()
 
-        return pd.DataFrame(all_results)
+        # Build from column lists rather than a list of dicts to skip pandas' per-row dict conversion
+        return pd.DataFrame(
+            {field: [record[field] for record in all_results] for field in StandardTransaction.model_fields},
+            copy=False,
+        )
 
@@ -7,11 +7,23 @@ aggregations, KPIs, and AI-powered insights for the main dashboard.
 
 import pandas as pd
 from typing import Dict, Any
-import json
-from datetime import datetime
+import orjson
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from ai.ollama.factory import get_ollama_client
 
+# Columns of the recent transactions sent to the LLM; other columns only inflate the prompt
+AI_INSIGHT_COLUMNS = ['transaction_date', 'amount', 'category', 'description']
+
+# Insights for recently seen prompts, keyed by a hash of the model and prompt (least recently used first)
+AI_INSIGHTS_CACHE_SIZE = 16
+_ai_insights_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+# Insights are generated on worker threads shared by every Streamlit session
+_ai_insights_cache_lock = threading.Lock()
+
 class DashboardProcessor:
     """
     A processor dedicated to preparing data for the dashboard UI.
@@ -22,8 +34,10 @@ class DashboardProcessor:
         Uses the Hybrid Prompt Model to generate AI insights.
         """
         try:
-            summary_json = json.dumps(summary, indent=2)
-            data_csv = recent_data_slice.to_csv(index=False)
+            # The summary holds numpy scalars from the aggregations
+            summary_json = orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+            columns = [col for col in AI_INSIGHT_COLUMNS if col in recent_data_slice.columns]
+            data_csv = recent_data_slice.to_csv(index=False, columns=columns, date_format='%Y-%m-%d', float_format='%.2f')
 
             prompt = f"""
             You are a financial analyst AI. Your task is to provide a brief, encouraging overview of the user's spending and identify 1-2 novel, actionable insights based on the provided data.
@@ -47,6 +61,15 @@ class DashboardProcessor:
             """
             
             ollama_client = get_ollama_client()
+
+            # Unchanged data yields an identical prompt, so the previous answer is reused
+            cache_key = hashlib.blake2b(f"{ollama_client.config.model}\n{prompt}".encode(), digest_size=16).hexdigest()
+            with _ai_insights_cache_lock:
+                cached_insights = _ai_insights_cache.get(cache_key)
+                if cached_insights is not None:
+                    _ai_insights_cache.move_to_end(cache_key)
+                    return cached_insights
+
             llm_response = ollama_client.generate_completion(prompt)
             
             if llm_response.startswith("```json"):
@@ -54,7 +77,12 @@ class DashboardProcessor:
             if llm_response.endswith("```"):
                 llm_response = llm_response[:-3].strip()
 
-            return json.loads(llm_response)
+            insights = orjson.loads(llm_response)
+            with _ai_insights_cache_lock:
+                _ai_insights_cache[cache_key] = insights
+                if len(_ai_insights_cache) > AI_INSIGHTS_CACHE_SIZE:
+                    _ai_insights_cache.popitem(last=False)
+            return insights
 
         except Exception as e:
             print(f"Error generating AI insights: {e}")
@@ -75,34 +103,48 @@ class DashboardProcessor:
                 "display_month": {}
             }
 
-        transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
+        # The database layer already returns datetimes; only parse when given anything else
+        if not pd.api.types.is_datetime64_any_dtype(transactions_df['transaction_date']):
+            transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
 
         # --- Target Month Logic ---
         latest_transaction_date = transactions_df['transaction_date'].max()
         target_month = latest_transaction_date.month
         target_year = latest_transaction_date.year
 
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        is_current_month = (target_month == current_month) and (target_year == current_year)
+        now = pd.Timestamp.now()
+        is_current_month = (target_month == now.month) and (target_year == now.year)
 
         display_month = {
             "month_name": latest_transaction_date.strftime("%B %Y"),
             "is_current": is_current_month
         }
 
+        # --- Row masks ---
+        # The date and amount columns are read once; every slice below is cut from these arrays.
+        dates = transactions_df['transaction_date'].to_numpy()
+        is_spend = (transactions_df['amount'] < 0).to_numpy()
+        month_start = latest_transaction_date.to_period('M').start_time
+        next_month_start = month_start + pd.DateOffset(months=1)
+        in_target_month = (dates >= month_start.to_datetime64()) & (dates < next_month_start.to_datetime64())
+        six_months_ago = now - pd.DateOffset(months=5)
+        in_last_six_months = dates >= six_months_ago.to_datetime64()
+        ninety_days_ago = now - pd.DateOffset(days=90)
+        in_last_ninety_days = dates >= ninety_days_ago.to_datetime64()
+
         # --- KPIs and Category Chart (Target Month) ---
-        monthly_df = transactions_df[
-            (transactions_df['transaction_date'].dt.month == target_month) &
-            (transactions_df['transaction_date'].dt.year == target_year) &
-            (transactions_df['amount'] < 0)
-        ].copy()
-        monthly_df['amount'] = monthly_df['amount'].abs()
+        # Only the columns the aggregations read are sliced, rather than copying whole rows
+        monthly_df = transactions_df.loc[in_target_month & is_spend, ['category', 'amount']]
+        monthly_df = monthly_df.assign(amount=monthly_df['amount'].abs())
+
+        # One grouped pass yields per-category totals and maxima; the KPIs and chart derive from it.
+        # The total is summed directly; adding up the group sums can differ in the last float digit.
+        category_stats = monthly_df.groupby('category', observed=True)['amount'].agg(['sum', 'max'])
+        category_totals = category_stats['sum']
 
         total_spend = monthly_df['amount'].sum()
-        top_category_series = monthly_df.groupby('category')['amount'].sum().nlargest(1)
-        top_category = top_category_series.index[0] if not top_category_series.empty else "N/A"
-        largest_transaction = monthly_df['amount'].max() if not monthly_df.empty else 0
+        top_category = category_totals.idxmax() if not category_totals.empty else "N/A"
+        largest_transaction = category_stats['max'].max() if not category_stats.empty else 0
 
         kpis = {
             "total_spend": total_spend,
@@ -110,18 +152,7 @@ class DashboardProcessor:
             "largest_transaction": largest_transaction
         }
 
-        category_chart_data = monthly_df.groupby('category')['amount'].sum().reset_index()
-
-        # --- Spending Over Time (Last 6 Months) ---
-        six_months_ago = pd.Timestamp.now() - pd.DateOffset(months=5)
-        spending_over_time_df = transactions_df[
-            (transactions_df['transaction_date'] >= six_months_ago) &
-            (transactions_df['amount'] < 0)
-        ].copy()
-        spending_over_time_df['amount'] = spending_over_time_df['amount'].abs()
-        
-        spending_over_time_data = spending_over_time_df.set_index('transaction_date').resample('M')['amount'].sum().reset_index()
-        spending_over_time_data['month'] = spending_over_time_data['transaction_date'].dt.strftime('%b %Y')
+        category_chart_data = category_totals.rename('amount').reset_index()
 
         # --- AI Insights ---
         financial_summary = {
@@ -129,13 +160,32 @@ class DashboardProcessor:
             "top_spending_category": top_category,
             "category_totals": category_chart_data.set_index('category')['amount'].to_dict()
         }
-        ninety_days_ago = pd.Timestamp.now() - pd.DateOffset(days=90)
-        ai_data_slice = transactions_df[transactions_df['transaction_date'] >= ninety_days_ago].head(500)
+        ai_data_slice = transactions_df[in_last_ninety_days].head(500)
 
-        ai_insights = self._generate_ai_insights(financial_summary, ai_data_slice)
+        # The LLM call takes seconds, so it is started now and the remaining
+        # aggregations run while it is in flight.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ai_insights_future = executor.submit(self._generate_ai_insights, financial_summary, ai_data_slice)
 
-        # --- Recent Transactions ---
-        recent_transactions = transactions_df.sort_values(by='transaction_date', ascending=False).head(10)
+            # --- Spending Over Time (Last 6 Months) ---
+            spending_over_time_df = transactions_df.loc[in_last_six_months & is_spend, ['transaction_date', 'amount']]
+            spending_over_time_df = spending_over_time_df.assign(amount=spending_over_time_df['amount'].abs())
+        
+            # Group on integer month periods instead of resampling a DatetimeIndex;
+            # months without spend are filled with 0 as resampling would.
+            monthly_spend = spending_over_time_df.groupby(spending_over_time_df['transaction_date'].dt.to_period('M'))['amount'].sum()
+            if not monthly_spend.empty:
+                monthly_spend = monthly_spend.reindex(pd.period_range(monthly_spend.index.min(), monthly_spend.index.max(), freq='M'), fill_value=0)
+            spending_over_time_data = pd.DataFrame({
+                'transaction_date': monthly_spend.index.to_timestamp(how='end').normalize(),
+                'amount': monthly_spend.to_numpy(),
+                'month': monthly_spend.index.strftime('%b %Y'),
+            })
+
+            # --- Recent Transactions ---
+            recent_transactions = transactions_df.nlargest(10, 'transaction_date')
+
+            ai_insights = ai_insights_future.result()
 
         return {
             "kpis": kpis,
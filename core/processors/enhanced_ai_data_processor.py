@@ -10,15 +10,18 @@ breaking down the analysis into three distinct, sequential passes:
 '''
 
 import pandas as pd
-import json
-from pydantic import BaseModel, Field, ValidationError
-from typing import Dict, List, Optional, Callable, Literal, Union
+import orjson
+import re
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from typing import Dict, List, Optional, Callable, Literal, Pattern, Tuple, Union
 from enum import Enum
 import math
 
+from ai.ollama.client import OllamaClient
 from ai.ollama.factory import get_ollama_client
 from core.database.db_interface import DatabaseInterface
-from .abstract_processor import AbstractDataProcessor, StandardTransaction, enforce_output_schema
+from .abstract_processor import AbstractDataProcessor, StandardTransaction
+from .utils import DebugColors, to_delimited_text, write_debug_block
 
 # --- Configuration ---
 HEAD_SAMPLE_SIZE = 10
@@ -26,6 +29,39 @@ RANDOM_SAMPLE_SIZE = 5
 TAIL_SAMPLE_SIZE = 10
 CATEGORIZATION_BATCH_SIZE = 10
 MAX_RETRIES = 1
+# Column names that unambiguously hold the description; Pass 2 skips the LLM when one is present
+EXACT_DESCRIPTION_COLUMNS = {'description', 'narration', 'narrative', 'details', 'particulars', 'transaction details', 'transaction description'}
+# Merchants that identify a transaction on their own, mapped to (category, sub_category,
+# expected amount sign: -1 debit, 1 credit). Pass 3 skips the LLM only for rows that
+# name one of these and carry the expected sign; everything else is left to the LLM.
+MERCHANT_KEYWORDS: Dict[str, Tuple[str, str, int]] = {
+    'amazon': ('Personal Spending', 'Shopping', -1),
+    'flipkart': ('Personal Spending', 'Shopping', -1),
+    'myntra': ('Personal Spending', 'Shopping', -1),
+    'amazon prime': ('Personal Spending', 'Subscriptions', -1),
+    'netflix': ('Personal Spending', 'Subscriptions', -1),
+    'spotify': ('Personal Spending', 'Subscriptions', -1),
+    'hotstar': ('Personal Spending', 'Subscriptions', -1),
+    'bookmyshow': ('Personal Spending', 'Entertainment', -1),
+    'swiggy': ('Food', 'Takeaway', -1),
+    'zomato': ('Food', 'Takeaway', -1),
+    'uber eats': ('Food', 'Takeaway', -1),
+    'bigbasket': ('Food', 'Groceries', -1),
+    'blinkit': ('Food', 'Groceries', -1),
+    'zepto': ('Food', 'Groceries', -1),
+    'uber': ('Transportation', 'Ride Sharing', -1),
+    'rapido': ('Transportation', 'Ride Sharing', -1),
+    'irctc': ('Transportation', 'Public Transit', -1),
+    'indian oil': ('Transportation', 'Fuel', -1),
+    'bharat petroleum': ('Transportation', 'Fuel', -1),
+    'hindustan petroleum': ('Transportation', 'Fuel', -1),
+    'pharmeasy': ('Healthcare', 'Pharmacy', -1),
+    'netmeds': ('Healthcare', 'Pharmacy', -1),
+    'apollo pharmacy': ('Healthcare', 'Pharmacy', -1),
+    'zerodha': ('Financial', 'Investment', -1),
+    'groww': ('Financial', 'Investment', -1),
+    'salary': ('Income', '', 1),
+}
 
 # --- Schemas for LLM Validation ---
 
@@ -62,11 +98,39 @@ class SemanticMapping(BaseModel):
     """
     description_column: Union[str, List[str]]
 
-# --- ANSI color codes for debug printing ---
-class DebugColors:
-    PROMPT = '\033[94m'  # Blue
-    LLM_OUTPUT = '\033[93m'  # Yellow
-    ENDC = '\033[0m'
+class CategoryAssignment(BaseModel):
+    """The expected JSON structure of each element of the LLM's Pass 3 array."""
+    category: str
+    sub_category: str = ""
+
+# JSON schemas passed to Ollama's structured output so each pass can only return valid JSON
+STRUCTURAL_INFO_SCHEMA = StructuralInfo.model_json_schema()
+SEMANTIC_MAPPING_SCHEMA = SemanticMapping.model_json_schema()
+CATEGORIZATION_ADAPTER = TypeAdapter(List[CategoryAssignment])
+CATEGORIZATION_SCHEMA = CATEGORIZATION_ADAPTER.json_schema()
+
+# Pass 3 prompt; only the category JSON and the batch data are substituted per call
+CATEGORIZATION_PROMPT_TEMPLATE = """
+        You are an expert financial data categorization AI. Your task is to analyze the following structured transaction data and assign a category and sub_category to each transaction.
+
+        Follow these instructions precisely:
+        1.  Assign a 'category' and 'sub_category' from the provided hierarchy.
+        2.  If a transaction fits a parent category but no specific sub-category, leave 'sub_category' blank.
+        3.  If no suitable category is found, assign 'category' to 'Other' and leave 'sub_category' blank.
+        4.  Return a single, valid JSON array of objects. Each object must correspond to a row in the input.
+
+        Here is the category hierarchy to use:
+        ```json
+        {category_json_string}
+        ```
+
+        Transaction Data:
+        ---
+        {data_text}
+        ---
+
+        Respond with only the JSON array. Each object must contain 'category' and 'sub_category'.
+        """
 
 class EnhancedAIDataProcessor(AbstractDataProcessor):
     """
@@ -82,16 +146,16 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         """
         self.db_interface = DatabaseInterface()
         self._debug = debug
+        self._ollama_client: Optional[OllamaClient] = None
+        self._category_hierarchy: Optional[Dict[str, List[str]]] = None
+        self._category_json: Optional[str] = None
+        self._keyword_matcher: Optional[Tuple[Optional[Pattern], Dict[str, tuple]]] = None
 
-    def _strip_codefence(self, text: str) -> str:
-        """
-        Strips code fence from the text if present.
-        """
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.endswith("```"):
-            text = text[:-3]
-        return text.strip()
+    def _get_ollama_client(self) -> OllamaClient:
+        """Returns the Ollama client, fetching it from the factory on first use."""
+        if self._ollama_client is None:
+            self._ollama_client = get_ollama_client()
+        return self._ollama_client
 
     def _create_data_sample(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -128,7 +192,7 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         Raises:
             ValueError: If the LLM fails to return a valid structural schema.
         """
-        sample_text = df_sample.to_csv(index=False)
+        sample_text = to_delimited_text(df_sample)
         column_names = df_sample.columns.tolist()
 
         prompt = f"""
@@ -185,21 +249,19 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         """
 
         if self._debug:
-            print(f"\n{DebugColors.PROMPT}{'='*50}\n[PASS 1: STRUCTURAL PROMPT]\n{'='*50}\n{prompt}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.PROMPT, "[PASS 1: STRUCTURAL PROMPT]", prompt)
 
-        ollama_client = get_ollama_client()
-        response = ollama_client.generate_completion(prompt)
+        ollama_client = self._get_ollama_client()
+        response = ollama_client.generate_completion(prompt, format=STRUCTURAL_INFO_SCHEMA)
 
         if self._debug:
-            print(f"\n{DebugColors.LLM_OUTPUT}{'='*50}\n[PASS 1: LLM RAW OUTPUT]\n{'='*50}\n{response}{DebugColors.ENDC}")
-
-        response = self._strip_codefence(response)
+            write_debug_block(DebugColors.LLM_OUTPUT, "[PASS 1: LLM RAW OUTPUT]", response)
 
         try:
-            response_json = json.loads(response)
+            response_json = orjson.loads(response)
             structural_info = StructuralInfo(**response_json)
             return structural_info
-        except (json.JSONDecodeError, ValidationError) as e:
+        except (orjson.JSONDecodeError, ValidationError) as e:
             raise ValueError(f"Failed to decode or validate LLM response for structural analysis: {e}")
 
     def _get_used_columns(self, structural_info: StructuralInfo) -> List[str]:
@@ -236,7 +298,11 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         if not remaining_columns:
             raise ValueError("No columns remaining for description mapping.")
 
-        sample_text = df[remaining_columns].head(HEAD_SAMPLE_SIZE).to_csv(index=False)
+        for col in remaining_columns:
+            if str(col).lower().strip() in EXACT_DESCRIPTION_COLUMNS:
+                return SemanticMapping(description_column=col)
+
+        sample_text = to_delimited_text(df[remaining_columns].head(HEAD_SAMPLE_SIZE))
 
         prompt = f"""
         You are a financial data analyst. Your task is to identify the column that best represents the transaction **description** or **narrative**.
@@ -265,20 +331,19 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         """
 
         if self._debug:
-            print(f"\n{DebugColors.PROMPT}{'='*50}\n[PASS 2: SEMANTIC PROMPT]\n{'='*50}\n{prompt}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.PROMPT, "[PASS 2: SEMANTIC PROMPT]", prompt)
 
-        ollama_client = get_ollama_client()
-        response = ollama_client.generate_completion(prompt)
+        ollama_client = self._get_ollama_client()
+        response = ollama_client.generate_completion(prompt, format=SEMANTIC_MAPPING_SCHEMA)
 
         if self._debug:
-            print(f"\n{DebugColors.LLM_OUTPUT}{'='*50}\n[PASS 2: LLM RAW OUTPUT]\n{'='*50}\n{response}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.LLM_OUTPUT, "[PASS 2: LLM RAW OUTPUT]", response)
 
-        response = self._strip_codefence(response)
         try:
-            response_json = json.loads(response)
+            response_json = orjson.loads(response)
             semantic_mapping = SemanticMapping(**response_json)
             return semantic_mapping
-        except (json.JSONDecodeError, ValidationError) as e:
+        except (orjson.JSONDecodeError, ValidationError) as e:
             raise ValueError(f"Failed to decode or validate LLM response for semantic mapping: {e}")
 
     def _find_best_fallback_description_column(self, columns: List[str]) -> Optional[str]:
@@ -294,97 +359,180 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         """
         Uses pandas to transform the raw DataFrame into a standardized intermediate format.
         """
-        mapped_data = pd.DataFrame()
+        # Columns are collected first and the frame is built once, rather than inserted one by one
+        mapped_columns = {}
 
         # 1. Map Transaction Date
         date_info = structural_info.date_info
-        mapped_data['transaction_date'] = pd.to_datetime(df[date_info.column_name], format=date_info.format_string, errors='coerce').dt.strftime('%Y-%m-%d')
+        mapped_columns['transaction_date'] = pd.to_datetime(df[date_info.column_name], format=date_info.format_string, errors='coerce').dt.strftime('%Y-%m-%d')
 
         # 2. Map Description
         if isinstance(semantic_mapping.description_column, list):
-            # Fallback: concatenate multiple columns
-            mapped_data['description'] = df[semantic_mapping.description_column].astype(str).agg(' - '.join, axis=1)
+            # Fallback: concatenate multiple columns column-wise instead of joining row by row.
+            # Missing cells become empty parts whose separators are removed afterwards, so one
+            # empty column neither blanks the description nor leaves a dangling ' - '.
+            description_parts = df[semantic_mapping.description_column].astype(object).fillna('').astype(str)
+            description_parts = description_parts.apply(lambda part: part.str.strip())
+            description = description_parts.iloc[:, 0].str.cat(
+                [description_parts.iloc[:, i] for i in range(1, description_parts.shape[1])], sep=' - ', na_rep=''
+            )
+            description = description.str.replace(r'(?: - ){2,}', ' - ', regex=True).str.replace(r'^ - | - $', '', regex=True)
+            # A row with every part empty has no description, as with a missing single column
+            mapped_columns['description'] = description.mask(description == '')
         else:
-            mapped_data['description'] = df[semantic_mapping.description_column]
+            mapped_columns['description'] = df[semantic_mapping.description_column]
 
         # 3. Map Amount
         amount_info = structural_info.amount_info
         if amount_info.representation == AmountRepresentation.DUAL_COLUMN_DEBIT_CREDIT:
             debit = pd.to_numeric(df[amount_info.debit_column], errors='coerce').fillna(0)
             credit = pd.to_numeric(df[amount_info.credit_column], errors='coerce').fillna(0)
-            mapped_data['amount'] = credit - debit
+            mapped_columns['amount'] = credit - debit
         elif amount_info.representation == AmountRepresentation.SINGLE_COLUMN_SIGNED:
-            mapped_data['amount'] = pd.to_numeric(df[amount_info.amount_column], errors='coerce').fillna(0)
+            mapped_columns['amount'] = pd.to_numeric(df[amount_info.amount_column], errors='coerce').fillna(0)
         elif amount_info.representation == AmountRepresentation.SINGLE_COLUMN_WITH_TYPE:
             amount = pd.to_numeric(df[amount_info.amount_column], errors='coerce').fillna(0)
             # Flip sign for debits
             debit_identifier = amount_info.debit_identifier if amount_info.debit_identifier is not None else ""
             debit_mask = df[amount_info.type_column].str.contains(debit_identifier, case=False)
             amount[debit_mask] = amount[debit_mask] * -1
-            mapped_data['amount'] = amount
+            mapped_columns['amount'] = amount
+
+        mapped_data = pd.DataFrame(mapped_columns)
 
         # Drop rows where essential data could not be parsed
         mapped_data.dropna(subset=['transaction_date', 'description', 'amount'], inplace=True)
         return mapped_data
 
+    def _get_category_hierarchy(self) -> Dict[str, List[str]]:
+        """
+        Returns the category hierarchy, reading it from the database on first use.
+
+        Categories rarely change, so the hierarchy is cached until
+        `refresh_categories` is called.
+        """
+        if self._category_hierarchy is None:
+            self._category_hierarchy = self._prepare_category_prompt_data()
+        return self._category_hierarchy
+
+    def _get_category_json(self) -> str:
+        """Returns the cached category hierarchy serialized for the categorization prompt."""
+        if self._category_json is None:
+            self._category_json = orjson.dumps(self._get_category_hierarchy(), option=orjson.OPT_INDENT_2).decode()
+        return self._category_json
+
+    def refresh_categories(self) -> None:
+        """Discards the cached category hierarchy so it is reloaded on the next run."""
+        self._category_hierarchy = None
+        self._category_json = None
+        self._keyword_matcher = None
+
     def _prepare_category_prompt_data(self) -> Dict[str, List[str]]:
         """Fetches categories and transforms them into a hierarchical dictionary for the LLM prompt."""
         categories_df = self.db_interface.get_categories_table()
-        hierarchy = {}
-        parent_categories = categories_df[categories_df['parent_category'].isnull()]['name'].unique()
-        for parent in parent_categories:
-            hierarchy[parent] = []
-        
-        for _, row in categories_df.iterrows():
-            if pd.notna(row['parent_category']) and row['parent_category'] in hierarchy:
-                hierarchy[row['parent_category']].append(row['name'])
-        return hierarchy
+        has_parent = categories_df['parent_category'].notna()
+        children = categories_df[has_parent].groupby('parent_category', sort=False)['name'].agg(list).to_dict()
+        parent_categories = categories_df[~has_parent]['name'].unique()
+        return {parent: children.get(parent, []) for parent in parent_categories}
 
-    def _process_categorization_batch(self, batch_df: pd.DataFrame, category_hierarchy: Dict[str, List[str]]) -> List[Dict]:
-        """
-        Processes a single batch of standardized data for categorization.
+    def _build_keyword_matcher(self, category_hierarchy: Dict[str, List[str]]) -> Tuple[Optional[Pattern], Dict[str, tuple]]:
         """
-        data_text = batch_df.to_csv(index=False)
-        category_json_string = json.dumps(category_hierarchy, indent=2)
+        Compiles the curated MERCHANT_KEYWORDS into a single case-insensitive alternation.
 
-        prompt = f"""
-        You are an expert financial data categorization AI. Your task is to analyze the following structured transaction data and assign a category and sub_category to each transaction.
+        Entries whose category or sub-category is missing from the current
+        hierarchy (e.g. after the user edited their categories) are left out.
 
-        Follow these instructions precisely:
-        1.  Assign a 'category' and 'sub_category' from the provided hierarchy.
-        2.  If a transaction fits a parent category but no specific sub-category, leave 'sub_category' blank.
-        3.  If no suitable category is found, assign 'category' to 'Other' and leave 'sub_category' blank.
-        4.  Return a single, valid JSON array of objects. Each object must correspond to a row in the input.
+        Returns:
+            The compiled pattern (None if no entry applies) and a map from each
+            lower-cased keyword to its (category, sub_category, sign) entry.
+        """
+        keyword_map = {
+            keyword: entry for keyword, entry in MERCHANT_KEYWORDS.items()
+            if entry[0] in category_hierarchy and (not entry[1] or entry[1] in category_hierarchy[entry[0]])
+        }
+        if not keyword_map:
+            return None, keyword_map
+
+        # Longest keywords first so "amazon prime" wins over "amazon"
+        alternation = '|'.join(re.escape(keyword) for keyword in sorted(keyword_map, key=len, reverse=True))
+        return re.compile(rf'\b({alternation})\b', re.IGNORECASE), keyword_map
+
+    def _get_keyword_matcher(self) -> Tuple[Optional[Pattern], Dict[str, tuple]]:
+        """Returns the compiled keyword matcher, built once per cached category hierarchy."""
+        if self._keyword_matcher is None:
+            self._keyword_matcher = self._build_keyword_matcher(self._get_category_hierarchy())
+        return self._keyword_matcher
+
+    def _categorize_by_keywords(self, descriptions: pd.Series, amounts: pd.Series) -> pd.DataFrame:
+        """
+        Categorizes descriptions that name a known merchant (e.g. "NETFLIX.COM").
 
-        Here is the category hierarchy to use:
-        ```json
-        {category_json_string}
-        ```
+        All keywords are matched through one precompiled alternation, so matching
+        runs as a single vectorized pass. A match only counts when the amount has
+        the sign the merchant is trusted for, so a refund from a shop or a debit
+        mentioning "salary" is still sent to the LLM.
 
-        Transaction Data:
-        ---
-        {data_text}
-        ---
+        Returns:
+            A DataFrame aligned with `descriptions` holding 'category' and
+            'sub_category', with NaN for rows that are left to the LLM.
+        """
+        pattern, keyword_map = self._get_keyword_matcher()
+        result = pd.DataFrame(index=descriptions.index, columns=['category', 'sub_category'], dtype=object)
+        if pattern is None:
+            return result
+
+        matched = descriptions.astype(str).str.extract(pattern, expand=False).str.lower()
+        expected_sign = matched.map({keyword: sign for keyword, (_, _, sign) in keyword_map.items()})
+        sign_matches = pd.to_numeric(amounts, errors='coerce') * expected_sign > 0
+        hits = matched[sign_matches].map(keyword_map)
+        result.loc[hits.index, 'category'] = [category for category, _, _ in hits]
+        result.loc[hits.index, 'sub_category'] = [sub_category for _, sub_category, _ in hits]
+        return result
+
+    def _validate_category_assignments(self, records: List) -> List[Dict]:
+        """
+        Validates a batch of category assignments returned by the LLM.
 
-        Respond with only the JSON array. Each object must contain 'category' and 'sub_category'.
+        The whole list is validated in a single call; only when that fails are
+        the records checked one by one, so a malformed record falls back to
+        'Other' without discarding the rest of the batch.
+        """
+        try:
+            return CATEGORIZATION_ADAPTER.dump_python(CATEGORIZATION_ADAPTER.validate_python(records))
+        except ValidationError:
+            validated = []
+            for record in records:
+                try:
+                    validated.append(CategoryAssignment.model_validate(record).model_dump())
+                except ValidationError as e:
+                    if self._debug:
+                        print(f"Falling back to 'Other' for an invalid category record: {e}")
+                    validated.append(CategoryAssignment(category='Other').model_dump())
+            return validated
+
+    def _process_categorization_batch(self, batch_df: pd.DataFrame, category_json_string: str) -> List[Dict]:
+        """
+        Processes a single batch of standardized data for categorization.
         """
+        data_text = to_delimited_text(batch_df)
+
+        prompt = CATEGORIZATION_PROMPT_TEMPLATE.format_map({'category_json_string': category_json_string, 'data_text': data_text})
 
         if self._debug:
-            print(f"\n{DebugColors.PROMPT}{'='*50}\n[PASS 3: CATEGORIZATION PROMPT]\n{'='*50}\n{prompt}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.PROMPT, "[PASS 3: CATEGORIZATION PROMPT]", prompt)
 
-        ollama_client = get_ollama_client()
-        llm_response = ollama_client.generate_completion(prompt)
+        ollama_client = self._get_ollama_client()
+        llm_response = ollama_client.generate_completion(prompt, format=CATEGORIZATION_SCHEMA)
 
         if self._debug:
-            print(f"\n{DebugColors.LLM_OUTPUT}{'='*50}\n[PASS 3: LLM RAW OUTPUT]\n{'='*50}\n{llm_response}{DebugColors.ENDC}")
+            write_debug_block(DebugColors.LLM_OUTPUT, "[PASS 3: LLM RAW OUTPUT]", llm_response)
 
         try:
-            response = self._strip_codefence(llm_response)
-            parsed_json = json.loads(response)
+            parsed_json = orjson.loads(llm_response)
             if not isinstance(parsed_json, list) or len(parsed_json) != len(batch_df):
                 raise ValueError("LLM did not return a valid JSON array of the correct length.")
-            return parsed_json
-        except (json.JSONDecodeError, ValueError) as e:
+            return self._validate_category_assignments(parsed_json)
+        except (orjson.JSONDecodeError, ValueError) as e:
             # Re-raise as a specific error to be handled by the retry loop
             raise ValueError(f"Failed to process categorization batch: {e}") from e
 
@@ -395,15 +543,18 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
         if mapped_df.empty:
             return pd.DataFrame()
 
-        category_hierarchy = self._prepare_category_prompt_data()
-        all_results = []
-        num_batches = math.ceil(len(mapped_df) / CATEGORIZATION_BATCH_SIZE)
+        category_json_string = self._get_category_json()
 
-        for i in range(num_batches):
-            batch_start = i * CATEGORIZATION_BATCH_SIZE
-            batch_end = batch_start + CATEGORIZATION_BATCH_SIZE
-            batch_df = mapped_df.iloc[batch_start:batch_end]
+        # Well-known merchants are categorized by keyword; only the misses go to the LLM
+        mapped_df = mapped_df.reset_index(drop=True)
+        keyword_matches = self._categorize_by_keywords(mapped_df['description'], mapped_df['amount'])
+        matched_mask = keyword_matches['category'].notna()
+        llm_df = mapped_df[~matched_mask]
+        llm_records: List[Dict] = []
+        num_batches = math.ceil(len(llm_df) / CATEGORIZATION_BATCH_SIZE)
+        batches = [llm_df.iloc[start:start + CATEGORIZATION_BATCH_SIZE] for start in range(0, len(llm_df), CATEGORIZATION_BATCH_SIZE)]
 
+        for i, batch_df in enumerate(batches):
             if on_progress:
                 progress = 0.66 + ((i / num_batches) * 0.34)
                 on_progress(progress, f"Categorizing batch {i+1}/{num_batches}...")
@@ -411,13 +562,7 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
             retries = 0
             while retries <= MAX_RETRIES:
                 try:
-                    categorized_results = self._process_categorization_batch(batch_df, category_hierarchy)
-                    if categorized_results:
-                        # Combine original batch data with categorized results
-                        batch_df.reset_index(drop=True, inplace=True)
-                        categorized_df = pd.DataFrame(categorized_results)
-                        merged_batch = pd.concat([batch_df, categorized_df], axis=1)
-                        all_results.append(merged_batch)
+                    llm_records.extend(self._process_categorization_batch(batch_df, category_json_string))
                     break # Success
                 except Exception as e:
                     retries += 1
@@ -426,15 +571,16 @@ class EnhancedAIDataProcessor(AbstractDataProcessor):
                     if retries > MAX_RETRIES:
                         # Halt on final failure
                         raise RuntimeError(f"Failed to process batch {i+1} after {MAX_RETRIES+1} attempts. Halting processing.") from e
-        
-        if not all_results:
-            return pd.DataFrame()
 
-        final_df = pd.concat(all_results, ignore_index=True)
+        # Batches cover llm_df in order, so the collected records line up with its rows
+        if llm_records:
+            llm_categories = pd.DataFrame.from_records(llm_records, columns=['category', 'sub_category'], index=llm_df.index)
+            keyword_matches.loc[llm_df.index, ['category', 'sub_category']] = llm_categories
+
+        final_df = pd.concat([mapped_df, keyword_matches], axis=1)
         return final_df
 
-    @enforce_output_schema
-    def process_raw_data(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
+    def _process_impl(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
         """
         Orchestrates the three-pass pipeline to process the raw DataFrame.
         """
@@ -6,13 +6,22 @@ It attempts to use an AI for categorization first, and falls back to a simple
 rule-based approach if the AI service is unavailable.
 """
 
+import re
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Callable, Optional
 
 from .abstract_processor import AbstractDataProcessor
+from .utils import DATE_SAMPLE_SIZE, infer_date_format
 from ai.ollama.client import OllamaClient
 from ai.ollama.factory import get_ollama_client, is_ollama_available
 
+# Standard columns every statement must provide after mapping
+REQUIRED_COLUMNS = frozenset({'transaction_date', 'description', 'amount'})
+
+# Currency markers, thousands separators and whitespace stripped from amount strings in one pass
+AMOUNT_NOISE_PATTERN = re.compile(r'Rs\.?|[₹$,\s]')
+
 class RuleBasedDataProcessor(AbstractDataProcessor):
     """
     A processor that uses AI for categorization with a rule-based fallback.
@@ -29,6 +38,12 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
             'description': ['description', 'details', 'transaction_details', 'narration', 'particulars', 'transaction details'],
             'amount': ['amount', 'transaction_amount', 'value', 'transaction amount'],
         }
+        # Every known column name mapped to its standard column and its preference rank
+        self.column_name_lookup = {
+            possible_name: (standard_col, rank)
+            for standard_col, possible_names in self.column_mappings.items()
+            for rank, possible_name in enumerate(possible_names)
+        }
         
         # Simple category rules for fallback categorization
         self.category_rules = {
@@ -43,6 +58,11 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
             'Salary': ['salary', 'wages', 'income'],
             'Other': []
         }
+        # One alternation per category, so each description is searched once per category
+        self.category_patterns = {
+            category: re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+            for category, keywords in self.category_rules.items() if keywords
+        }
 
         # AI Client Initialization
         if ollama_client:
@@ -52,10 +72,10 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
             self.ollama_enabled = is_ollama_available()
             self.ollama_client = get_ollama_client() if self.ollama_enabled else None
 
-    def process_raw_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _process_impl(self, df: pd.DataFrame, on_progress: Optional[Callable[[float, str], None]] = None) -> pd.DataFrame:
         """
         Main processing method that orchestrates the data transformation pipeline.
-        The @enforce_output_schema decorator is inherited from the parent class.
+        The output schema is enforced by the parent's `process_raw_data`.
         """
         if df.empty:
             raise ValueError("Input DataFrame is empty")
@@ -70,41 +90,43 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
         """
         Maps raw DataFrame columns to the standard schema.
         """
-        mapped_df = df.copy()
-        column_map = {}
-        
-        df_columns_lower = [str(col).lower().strip() for col in df.columns]
-        
-        for standard_col, possible_names in self.column_mappings.items():
-            for possible_name in possible_names:
-                if possible_name.lower() in df_columns_lower:
-                    original_col = df.columns[df_columns_lower.index(possible_name.lower())]
-                    column_map[original_col] = standard_col
-                    break
-        
-        mapped_df = mapped_df.rename(columns=column_map)
+        # Normalize each column name once; the first column wins if two normalize alike
+        normalized_columns = {}
+        for col in df.columns:
+            normalized_columns.setdefault(str(col).lower().strip(), col)
+        
+        # Each column is looked up once; when several columns fit the same
+        # standard column, the one whose name is listed first wins.
+        best_matches = {}
+        for normalized_col, original_col in normalized_columns.items():
+            match = self.column_name_lookup.get(normalized_col)
+            if match is None:
+                continue
+            standard_col, rank = match
+            if standard_col not in best_matches or rank < best_matches[standard_col][0]:
+                best_matches[standard_col] = (rank, original_col)
+        column_map = {original_col: standard_col for standard_col, (_, original_col) in best_matches.items()}
+        
+        # rename returns a new frame, so the caller's DataFrame is never modified
+        mapped_df = df.rename(columns=column_map)
         
         if 'amount' not in mapped_df.columns:
-            debit_col, credit_col = None, None
-            for col in mapped_df.columns:
-                if str(col).lower() in ['debit', 'debit_amount']:
-                    debit_col = col
-                elif str(col).lower() in ['credit', 'credit_amount']:
-                    credit_col = col
+            debit_col = normalized_columns.get('debit', normalized_columns.get('debit_amount'))
+            credit_col = normalized_columns.get('credit', normalized_columns.get('credit_amount'))
             
             if debit_col and credit_col:
                 mapped_df['amount'] = pd.to_numeric(mapped_df[credit_col], errors='coerce').fillna(0) - \
                                       pd.to_numeric(mapped_df[debit_col], errors='coerce').fillna(0)
                 mapped_df = mapped_df.drop(columns=[debit_col, credit_col])
         
-        required_cols = {'transaction_date', 'description', 'amount'}
-        if not required_cols.issubset(mapped_df.columns):
-            missing = required_cols - set(mapped_df.columns)
+        if not REQUIRED_COLUMNS.issubset(mapped_df.columns):
+            missing = set(REQUIRED_COLUMNS) - set(mapped_df.columns)
             raise ValueError(f"Cannot map required columns: {missing}")
         
-        for col in ['category', 'sub_category']:
-            if col not in mapped_df.columns:
-                mapped_df[col] = ""
+        # Missing optional columns are added in a single reindex rather than inserted one by one
+        missing_optional = [col for col in ('category', 'sub_category') if col not in mapped_df.columns]
+        if missing_optional:
+            mapped_df = mapped_df.reindex(columns=[*mapped_df.columns, *missing_optional], fill_value="")
         
         return mapped_df
 
@@ -112,14 +134,23 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
         """
         Performs basic data validation and cleaning.
         """
-        cleaned_df = df.copy()
-        
-        cleaned_df['transaction_date'] = pd.to_datetime(cleaned_df['transaction_date'], errors='coerce')
+        # Every column below is replaced rather than written into, so a shallow copy suffices
+        cleaned_df = df.copy(deep=False)
+        
+        # Columns that already hold parsed values (e.g. from Excel) skip the string work below
+        if not pd.api.types.is_datetime64_any_dtype(cleaned_df['transaction_date']):
+            # With a format inferred from a sample, the whole column takes pandas' exact-format
+            # parser; otherwise pandas guesses the format from the first value.
+            date_format = infer_date_format(cleaned_df[['transaction_date']].head(DATE_SAMPLE_SIZE))
+            cleaned_df['transaction_date'] = pd.to_datetime(cleaned_df['transaction_date'], format=date_format, errors='coerce')
         cleaned_df = cleaned_df.dropna(subset=['transaction_date'])
         
-        if cleaned_df['amount'].dtype == 'object':
-            cleaned_df['amount'] = cleaned_df['amount'].astype(str).str.replace(r'[Rs$,\s]', '', regex=True)
-        cleaned_df['amount'] = pd.to_numeric(cleaned_df['amount'], errors='coerce')
+        if not pd.api.types.is_numeric_dtype(cleaned_df['amount']):
+            amounts = cleaned_df['amount'].astype(str).str.replace(AMOUNT_NOISE_PATTERN, '', regex=True)
+            # Accounting-style negatives such as "(1,200.00)" are parsed column-wise as well
+            is_negative = amounts.str.startswith('(') & amounts.str.endswith(')')
+            amounts = pd.to_numeric(amounts.str.strip('()'), errors='coerce')
+            cleaned_df['amount'] = amounts.mask(is_negative, -amounts)
         cleaned_df = cleaned_df.dropna(subset=['amount'])
         
         cleaned_df['description'] = cleaned_df['description'].astype(str).str.strip()
@@ -136,7 +167,7 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
         """
         Categorizes transactions using AI, with a rule-based fallback.
         """
-        categorized_df = df.copy()
+        categorized_df = df.copy(deep=False)
         
         if 'category' not in categorized_df.columns:
             categorized_df['category'] = ""
@@ -144,27 +175,37 @@ class RuleBasedDataProcessor(AbstractDataProcessor):
             categorized_df['sub_category'] = ""
 
         available_categories = list(self.category_rules.keys())
+        # Only the category column is written in place, so it is the only one copied
+        categories = categorized_df['category'].copy()
+        needs_category = categories.fillna('').astype(str).str.strip() == ''
+
+        # Statements repeat the same descriptions many times, so each distinct
+        # description is categorized once and the result is gathered back per row.
+        pending_descriptions = categorized_df.loc[needs_category, 'description'].astype(str)
+        codes, unique_descriptions = pd.factorize(pending_descriptions, use_na_sentinel=False)
 
         if self.ollama_enabled and self.ollama_client:
-            for idx, row in categorized_df.iterrows():
-                if pd.notna(row['category']) and row['category'].strip():
-                    continue
-                description = str(row['description'])
-                predicted_category = self.ollama_client.categorize_transaction(
-                    transaction_description=description,
+            unique_categories = np.array([
+                self.ollama_client.categorize_transaction(
+                    transaction_description=str(description),
                     available_categories=available_categories
                 )
-                categorized_df.at[idx, 'category'] = predicted_category
+                for description in unique_descriptions
+            ], dtype=object)
         else:
-            for idx, row in categorized_df.iterrows():
-                if pd.notna(row['category']) and row['category'].strip():
-                    continue
-                description = str(row['description']).lower()
-                assigned_category = 'Other'
-                for category, keywords in self.category_rules.items():
-                    if any(keyword.lower() in description for keyword in keywords):
-                        assigned_category = category
-                        break
-                categorized_df.at[idx, 'category'] = assigned_category
+            # Each category's pattern is applied to all distinct descriptions at once;
+            # the first category (in rule order) to match a description wins.
+            descriptions = pd.Series(unique_descriptions, dtype=object).astype(str).str.lower()
+            assigned = pd.Series('Other', index=descriptions.index, dtype=object)
+            unassigned = pd.Series(True, index=descriptions.index)
+            for category, pattern in self.category_patterns.items():
+                hits = unassigned & descriptions.str.contains(pattern)
+                assigned[hits] = category
+                unassigned &= ~hits
+            unique_categories = assigned.to_numpy()
+
+        # Predictions are written back in one assignment
+        categories.loc[needs_category] = unique_categories[codes]
         
+        categorized_df['category'] = categories
         return categorized_df
@@ -0,0 +1,83 @@
+"""
+Shared helpers for the data processors.
+
+Date format inference, prompt serialization and debug output used by more
+than one processor live here rather than in any single processor module.
+"""
+
+import sys
+from typing import Optional
+
+import pandas as pd
+
+DATE_SAMPLE_SIZE = 20
+
+# Date formats tried locally before falling back to asking the LLM
+DATE_FORMAT_CANDIDATES = [
+    '%Y-%m-%d', '%Y/%m/%d',
+    '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%m-%d-%Y', '%d.%m.%Y',
+    '%d/%m/%y', '%m/%d/%y', '%d-%m-%y', '%d.%m.%y',
+    '%d-%b-%Y', '%d %b %Y', '%d-%b-%y', '%d %b %y', '%d %B %Y', '%b %d, %Y',
+]
+# Share of a column's non-empty sample values that must parse (tolerates stray header rows)
+DATE_MATCH_THRESHOLD = 0.8
+
+# ANSI color codes for debug printing
+class DebugColors:
+    PROMPT = '\033[94m'  # Blue
+    LLM_OUTPUT = '\033[93m'  # Yellow
+    ENDC = '\033[0m'
+
+def write_debug_block(color: str, title: str, *texts: str) -> None:
+    """
+    Writes a colored, titled debug block to stdout.
+
+    The pieces are written one after another instead of being joined into a
+    single f-string, so a large prompt or response is never copied.
+    """
+    rule = '=' * 50
+    sys.stdout.writelines(('\n', color, rule, '\n', title, '\n', rule, '\n', *texts, DebugColors.ENDC, '\n'))
+
+def _format_cell(value) -> str:
+    """Renders a single cell for the prompt, blanking nulls and flattening embedded delimiters."""
+    if value is None or value != value:  # NaN is the only value not equal to itself
+        return ''
+    return str(value).replace('\t', ' ').replace('\n', ' ')
+
+def to_delimited_text(df: pd.DataFrame) -> str:
+    """
+    Serializes a DataFrame as tab-separated text for an LLM prompt.
+
+    This skips pandas' CSV writer (type inspection, quoting) since the prompt
+    only needs the cell values laid out row by row.
+    """
+    header = '\t'.join(_format_cell(col) for col in df.columns)
+    body = '\n'.join(
+        '\t'.join(_format_cell(value) for value in row)
+        for row in df.itertuples(index=False, name=None)
+    )
+    return f"{header}\n{body}"
+
+def infer_date_format(df_sample: pd.DataFrame) -> Optional[str]:
+    """
+    Infers the strftime format of the date column without an LLM call.
+
+    Each column is parsed against DATE_FORMAT_CANDIDATES; the first column that
+    matches exactly one candidate decides the format.
+
+    Returns:
+        The format string, or None if no column matched or the match was
+        ambiguous (e.g. every day in the sample is 12 or lower).
+    """
+    for col in df_sample.columns:
+        values = df_sample[col].dropna().astype(str).str.strip()
+        values = values[values != '']
+        if values.empty:
+            continue
+        matching = [
+            fmt for fmt in DATE_FORMAT_CANDIDATES
+            if pd.to_datetime(values, format=fmt, errors='coerce').notna().mean() >= DATE_MATCH_THRESHOLD
+        ]
+        if len(matching) == 1:
+            return matching[0]
+    return None
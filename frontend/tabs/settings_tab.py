@@ -35,11 +35,17 @@ def render():
             value=st.session_state.ollama_settings.timeout,
             min_value=1
         )
+        num_parallel = st.number_input(
+            "Parallel Requests",
+            value=st.session_state.ollama_settings.num_parallel,
+            min_value=1,
+            help="Maximum concurrent requests sent to Ollama. Match the server's OLLAMA_NUM_PARALLEL."
+        )
 
         submitted = st.form_submit_button("Save Settings")
         if submitted:
             try:
-                new_settings = OllamaSettings(base_url=base_url, model=model, timeout=timeout)
+                new_settings = OllamaSettings(base_url=base_url, model=model, timeout=timeout, num_parallel=num_parallel)
                 config_manager.save_settings(new_settings)
                 st.session_state.ollama_settings = new_settings
                 st.success("Settings saved successfully!")
@@ -63,6 +63,15 @@ def test_execute_request_raises_api_error_on_http_error(mocker, ollama_client):
     with pytest.raises(OllamaAPIError, match="HTTP error occurred: 404 - Not Found"):
         ollama_client._execute_request("/api/test")
 
+def test_execute_request_raises_connection_error_on_broken_response(mocker, ollama_client):
+    """Test that a response body cut off mid-transfer raises OllamaConnectionError."""
+    mock_response = MagicMock()
+    type(mock_response).text = mocker.PropertyMock(side_effect=requests.exceptions.ChunkedEncodingError("Connection broken"))
+    mocker.patch('requests.get', return_value=mock_response)
+    
+    with pytest.raises(OllamaConnectionError, match="interrupted mid-response"):
+        ollama_client._execute_request("/api/test")
+
 # 2. Tests for test_connection
 
 def test_test_connection_success(mocker, ollama_client):
@@ -120,7 +129,63 @@ def test_check_model_exists_returns_false_on_api_error(mocker, ollama_client):
     mocker.patch.object(ollama_client, 'list_models', side_effect=OllamaAPIError)
     assert ollama_client.check_model_exists() is False
 
-# 5. Tests for get_server_info
+# 5. Tests for stream_completion
+
+def test_stream_completion_yields_fragments(mocker, ollama_client):
+    """Test stream_completion yields each response fragment until the server reports done."""
+    mock_response = MagicMock()
+    mock_response.__enter__.return_value = mock_response
+    mock_response.iter_lines.return_value = [
+        b'{"response": "[{", "done": false}',
+        b'',
+        b'{"response": "}]", "done": false}',
+        b'{"response": "", "done": true}',
+    ]
+    mocker.patch('requests.post', return_value=mock_response)
+
+    fragments = list(ollama_client.stream_completion("prompt"))
+
+    assert fragments == ["[{", "}]", ""]
+    assert requests.post.call_args.kwargs["stream"] is True
+    assert requests.post.call_args.kwargs["json"]["stream"] is True
+
+def test_stream_completion_raises_api_error_on_connection_error(mocker, ollama_client):
+    """Test stream_completion wraps connection failures in an OllamaAPIError."""
+    mocker.patch('requests.post', side_effect=requests.exceptions.ConnectionError("Failed to connect"))
+
+    with pytest.raises(OllamaAPIError, match="Failed to stream completion"):
+        list(ollama_client.stream_completion("prompt"))
+
+def test_stream_completion_raises_api_error_when_stream_breaks(mocker, ollama_client):
+    """Test stream_completion wraps a connection dropped mid-stream in an OllamaAPIError."""
+    def broken_stream():
+        yield b'{"response": "[{", "done": false}'
+        raise requests.exceptions.ChunkedEncodingError("Connection broken: IncompleteRead")
+
+    mock_response = MagicMock()
+    mock_response.__enter__.return_value = mock_response
+    mock_response.iter_lines.return_value = broken_stream()
+    mocker.patch('requests.post', return_value=mock_response)
+
+    stream = ollama_client.stream_completion("prompt")
+
+    assert next(stream) == "[{"
+    with pytest.raises(OllamaAPIError, match="interrupted mid-response"):
+        next(stream)
+
+def test_stream_completion_sends_format_when_given(mocker, ollama_client):
+    """Test stream_completion forwards a structured output schema to the server."""
+    mock_response = MagicMock()
+    mock_response.__enter__.return_value = mock_response
+    mock_response.iter_lines.return_value = [b'{"response": "[]", "done": true}']
+    mocker.patch('requests.post', return_value=mock_response)
+    schema = {"type": "array", "items": {"type": "object"}}
+
+    list(ollama_client.stream_completion("prompt", format=schema))
+
+    assert requests.post.call_args.kwargs["json"]["format"] == schema
+
+# 6. Tests for get_server_info
 
 def test_get_server_info_success(mocker, ollama_client):
     """Test get_server_info returns a complete success dictionary when connected."""
@@ -54,4 +54,46 @@ def empty_pdf_file(tmp_path):
     pdf.add_page()
     file_path = tmp_path / "empty.pdf"
     pdf.output(str(file_path))
-    return str(file_path)
\ No newline at end of file
+    return str(file_path)
+
+def _write_encrypted_pdf(file_path, owner_password, user_password):
+    """Writes a one-table PDF encrypted with the given owner and user passwords."""
+    pdf = FPDF()
+    pdf.set_encryption(owner_password=owner_password, user_password=user_password)
+    pdf.add_page()
+    pdf.set_font("Helvetica", size=12)
+    pdf.cell(40, 10, 'Col1', 1)
+    pdf.cell(40, 10, 'Col2', 1)
+    pdf.ln()
+    pdf.cell(40, 10, 'Data1', 1)
+    pdf.cell(40, 10, 'Data2', 1)
+    pdf.output(str(file_path))
+    return str(file_path)
+
+@pytest.fixture(scope="session")
+def owner_only_encrypted_pdf_file(tmp_path_factory):
+    """Creates a PDF encrypted with an owner password only, so it opens without one."""
+    file_path = tmp_path_factory.mktemp("data") / "owner_only.pdf"
+    return _write_encrypted_pdf(file_path, owner_password="owner", user_password="")
+
+@pytest.fixture(scope="session")
+def user_password_pdf_file(tmp_path_factory):
+    """Creates a PDF that needs the user password 'secret' to be opened."""
+    file_path = tmp_path_factory.mktemp("data") / "user_password.pdf"
+    return _write_encrypted_pdf(file_path, owner_password="owner", user_password="secret")
+
+@pytest.fixture(scope="session")
+def multi_page_pdf_file(tmp_path_factory):
+    """Creates a six-page PDF with a small, distinct table on every page."""
+    pdf = FPDF()
+    pdf.set_font("Helvetica", size=12)
+    for page_number in range(1, 7):
+        pdf.add_page()
+        for row_number in range(1, 3):
+            pdf.cell(40, 10, f'Page{page_number}', 1)
+            pdf.cell(40, 10, f'Row{row_number}', 1)
+            pdf.ln()
+
+    file_path = tmp_path_factory.mktemp("data") / "multi_page.pdf"
+    pdf.output(str(file_path))
+    return str(file_path)
@@ -5,6 +5,7 @@ Tests for the PDFParser.
 import pytest
 import pandas as pd
 import io
+from core.parsers import pdf_parser
 from core.parsers.pdf_parser import PDFParser, is_pdf_encrypted, parse_pdf
 
 
@@ -27,10 +28,60 @@ def test_parse_unprotected_pdf_from_memory(unprotected_pdf_file):
     assert isinstance(df, pd.DataFrame)
     assert df.shape == (2, 2)
 
+def test_parallel_extraction_matches_serial(multi_page_pdf_file, mocker, monkeypatch):
+    """Test that extracting pages in a process pool yields the same rows, in order, as in-process."""
+    serial_df = parse_pdf(multi_page_pdf_file, password=None)
+
+    monkeypatch.setattr(pdf_parser, "PARALLEL_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(pdf_parser.os, "process_cpu_count", lambda: 4)
+    parallel_spy = mocker.spy(PDFParser, "_extract_rows_in_parallel")
+    parallel_df = parse_pdf(multi_page_pdf_file, password=None)
+
+    assert parallel_spy.call_count == 1
+    assert parallel_spy.call_args.args[1:] == (6, 4)
+    assert serial_df.shape == (12, 2)
+    pd.testing.assert_frame_equal(parallel_df, serial_df)
+
+def test_single_cpu_extracts_in_process(multi_page_pdf_file, mocker, monkeypatch):
+    """Test that no process pool is created when only one CPU is available."""
+    monkeypatch.setattr(pdf_parser, "PARALLEL_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(pdf_parser.os, "process_cpu_count", lambda: 1)
+    pool = mocker.patch.object(pdf_parser, "ProcessPoolExecutor")
+
+    df = parse_pdf(multi_page_pdf_file, password=None)
+
+    pool.assert_not_called()
+    assert df.shape == (12, 2)
+
 def test_is_pdf_encrypted_unprotected(unprotected_pdf_file):
     """Test that is_pdf_encrypted returns False for an unprotected PDF."""
     assert not is_pdf_encrypted(unprotected_pdf_file)
 
+def test_is_pdf_encrypted_detects_encrypt_dictionary(unprotected_pdf_file):
+    """Test that an /Encrypt entry in the trailer is reported as encrypted."""
+    with open(unprotected_pdf_file, "rb") as f:
+        content = f.read()
+    encrypted_content = content.replace(b"trailer\n<<", b"trailer\n<< /Encrypt 99 0 R", 1)
+    assert encrypted_content != content
+
+    assert is_pdf_encrypted(io.BytesIO(encrypted_content))
+    assert not is_pdf_encrypted(io.BytesIO(content))
+
+def test_is_pdf_encrypted_owner_password_only(owner_only_encrypted_pdf_file):
+    """Test that a PDF with only an owner password is not reported as needing one."""
+    with open(owner_only_encrypted_pdf_file, "rb") as f:
+        assert b"/Encrypt" in f.read()
+
+    assert not is_pdf_encrypted(owner_only_encrypted_pdf_file)
+    df = parse_pdf(owner_only_encrypted_pdf_file, password=None)
+    assert 'Col1' in df.iloc[0].values
+
+def test_is_pdf_encrypted_user_password(user_password_pdf_file):
+    """Test that a PDF with a user password is reported as encrypted and parses with it."""
+    assert is_pdf_encrypted(user_password_pdf_file)
+    df = parse_pdf(user_password_pdf_file, password="secret")
+    assert 'Col1' in df.iloc[0].values
+
 
 @pytest.mark.parametrize("password, should_succeed", [("correct_password", True), ("wrong_password", False)])
 def test_parse_protected_pdf(protected_pdf_file, mocker, password, should_succeed):
@@ -9,6 +9,14 @@ import json
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 
+@pytest.fixture(autouse=True)
+def isolated_working_dir(tmp_path, monkeypatch):
+    """
+    Runs each test from tmp_path, so the default SQLite database and Ollama
+    config file (both relative paths) are created there and not in the repo.
+    """
+    monkeypatch.chdir(tmp_path)
+
 @pytest.fixture
 def mock_db_interface(mocker):
     """Mocks the DatabaseInterface to return a fixed category table."""
@@ -38,7 +46,9 @@ def mock_ollama_client(mocker):
         }
     ]
     mock_response = json.dumps(mock_data)
-    mocker.patch('ai.ollama.factory.get_ollama_client').return_value.generate_completion.return_value = mock_response
+    mock_client = mocker.patch('ai.ollama.factory.get_ollama_client').return_value
+    mock_client.generate_completion.return_value = mock_response
+    mock_client.stream_completion.side_effect = lambda prompt, **kwargs: iter([mock_response])
 
 @pytest.fixture(params=[
     # Indian Banks
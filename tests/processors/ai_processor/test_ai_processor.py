@@ -4,7 +4,12 @@ Tests for the AIDataProcessor.
 
 import pytest
 import pandas as pd
-from core.processors.ai_data_processor import AIDataProcessor
+from unittest.mock import MagicMock
+from ai.ollama.config import OllamaConfig
+from core.processors.ai_data_processor import (
+    AIDataProcessor, MAX_BATCH_SIZE, MIN_BATCH_SIZE, _iter_json_array_items
+)
+from core.processors.utils import infer_date_format
 
 class TestAIDataProcessor:
     """Test suite for the AI-driven data processor."""
@@ -36,4 +41,55 @@ class TestAIDataProcessor:
         assert pd.api.types.is_datetime64_any_dtype(processed_df['transaction_date'])                          
         assert pd.api.types.is_numeric_dtype(processed_df['amount'])                                           
         assert pd.api.types.is_string_dtype(processed_df['description'])                                
-        assert pd.api.types.is_string_dtype(processed_df['category'])
\ No newline at end of file
+        assert pd.api.types.is_string_dtype(processed_df['category'])
+
+class TestStreamedResponseParsing:
+    """Tests for incremental parsing of streamed LLM output."""
+
+    def test_items_are_parsed_across_chunk_boundaries(self):
+        """Objects split across chunks, and a leading code fence, are handled."""
+        response = '```json\n[{"description": "A, [b]", "amount": -1}, {"description": "C", "amount": 2}]\n```'
+        chunks = [response[i:i + 4] for i in range(0, len(response), 4)]
+
+        items = list(_iter_json_array_items(chunks))
+
+        assert items == [{"description": "A, [b]", "amount": -1}, {"description": "C", "amount": 2}]
+
+    def test_non_array_response_raises(self):
+        """A response that is not a JSON array is rejected."""
+        with pytest.raises(ValueError, match="did not return a JSON array"):
+            list(_iter_json_array_items(['{"items": ', '[1, 2]}']))
+
+    def test_truncated_array_raises(self):
+        """A stream that ends mid-array is rejected."""
+        with pytest.raises(ValueError):
+            list(_iter_json_array_items(['[{"amount": 1}, {"amo']))
+
+class TestDateFormatInference:
+    """Tests for the local date format inference that precedes the LLM fallback."""
+
+    def test_unambiguous_format_is_inferred(self):
+        """A day above 12 settles the format, even with a header row in the data."""
+        sample = pd.DataFrame({
+            'Txn Date': ['Date', '01/02/2024', '15/02/2024', '20/02/2024', '28/02/2024', '29/02/2024'],
+            'Amount': ['Amount', '10.00', '-4.50', '3.25', '7.00', '1.10'],
+        })
+        assert infer_date_format(sample) == '%d/%m/%Y'
+
+    def test_ambiguous_format_returns_none(self):
+        """Dates that parse as both day-first and month-first are left to the LLM."""
+        sample = pd.DataFrame({'Date': ['01/02/2024', '03/04/2024']})
+        assert infer_date_format(sample) is None
+
+class TestBatchSizing:
+    """Tests for sizing batches from the context window and parallel slots."""
+
+    def test_zero_num_parallel_is_treated_as_one_slot(self):
+        """A num_parallel of 0 in the config must not break batch sizing."""
+        processor = AIDataProcessor()
+        processor._ollama_client = MagicMock(config=OllamaConfig(num_parallel=0))
+        df = pd.DataFrame({'Date': ['01/02/2024'] * 30, 'Description': ['Coffee'] * 30})
+
+        batch_size = processor._compute_batch_size(df, '{}', '%d/%m/%Y')
+
+        assert MIN_BATCH_SIZE <= batch_size <= MAX_BATCH_SIZE
@@ -0,0 +1,87 @@
+"""
+Tests for the EnhancedAIDataProcessor.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+import pytest
+from core.processors.enhanced_ai_data_processor import (
+    AmountInfo, AmountRepresentation, DateInfo, EnhancedAIDataProcessor, SemanticMapping, StructuralInfo
+)
+
+class TestApplyMappings:
+    """Tests for turning the LLM's column mapping into the intermediate DataFrame."""
+
+    def test_multi_column_description_skips_missing_parts(self):
+        """A NaN in one combined column neither drops the row nor leaks 'nan' into the text."""
+        df = pd.DataFrame({
+            'Date': ['01/02/2024', '02/02/2024', '03/02/2024'],
+            'Payee': ['SWIGGY', None, 'UBER'],
+            'Memo': ['Order 42', 'NEFT REF 7', np.nan],
+            'Amount': [-250.0, 1000.0, -120.0],
+        })
+        structural_info = StructuralInfo(
+            date_info=DateInfo(column_name='Date', format_string='%d/%m/%Y'),
+            amount_info=AmountInfo(representation=AmountRepresentation.SINGLE_COLUMN_SIGNED, amount_column='Amount'),
+        )
+        semantic_mapping = SemanticMapping(description_column=['Payee', 'Memo'])
+
+        mapped = EnhancedAIDataProcessor()._apply_mappings_to_dataframe(df, structural_info, semantic_mapping)
+
+        assert mapped['description'].tolist() == ['SWIGGY - Order 42', 'NEFT REF 7', 'UBER']
+        assert mapped['amount'].tolist() == [-250.0, 1000.0, -120.0]
+
+class TestKeywordCategorization:
+    """Tests for categorizing well-known merchants without the LLM in Pass 3."""
+
+    CATEGORY_HIERARCHY = {
+        'Income': [],
+        'Food': ['Groceries', 'Takeaway'],
+        'Utilities': ['Internet'],
+        'Personal Spending': ['Shopping', 'Subscriptions'],
+        'Other': [],
+    }
+
+    @pytest.fixture
+    def processor(self, mocker):
+        """A processor with a fixed category hierarchy and a mocked Ollama client."""
+        processor = EnhancedAIDataProcessor()
+        mocker.patch.object(processor, '_prepare_category_prompt_data', return_value=self.CATEGORY_HIERARCHY)
+        processor._ollama_client = MagicMock()
+        return processor
+
+    def test_only_unmatched_rows_reach_the_llm(self, processor):
+        """Merchant rows with the expected sign are matched; category names and wrong signs are not."""
+        mapped_df = pd.DataFrame({
+            'description': ['NETFLIX.COM', 'BY INTERNET BANKING NEFT TO RAVI', 'AMAZON REFUND', 'SALARY JULY', 'INCOME TAX PAYMENT'],
+            'amount': [-499.0, -2000.0, 350.0, 50000.0, -12000.0],
+        })
+
+        matches = processor._categorize_by_keywords(mapped_df['description'], mapped_df['amount'])
+
+        assert matches['category'].tolist() == ['Personal Spending', np.nan, np.nan, 'Income', np.nan]
+        assert matches['sub_category'].tolist() == ['Subscriptions', np.nan, np.nan, '', np.nan]
+
+    def test_llm_results_are_merged_back_in_row_order(self, processor):
+        """Keyword matches and LLM categories end up on their original rows."""
+        mapped_df = pd.DataFrame({
+            'transaction_date': pd.to_datetime(['2024-07-01', '2024-07-02', '2024-07-03', '2024-07-04']),
+            'description': ['SWIGGY ORDER 42', 'NEFT TO RAVI', 'AMAZON PRIME VIDEO', 'ACT FIBERNET BILL'],
+            'amount': [-250.0, -2000.0, -1499.0, -799.0],
+        })
+        processor._ollama_client.generate_completion.return_value = json.dumps([
+            {'category': 'Other', 'sub_category': ''},
+            {'category': 'Utilities', 'sub_category': 'Internet'},
+        ])
+
+        result = processor._execute_pass_3_categorization(mapped_df, on_progress=None)
+
+        prompt = processor._ollama_client.generate_completion.call_args.args[0]
+        assert 'NEFT TO RAVI' in prompt and 'ACT FIBERNET BILL' in prompt
+        assert 'SWIGGY' not in prompt and 'AMAZON PRIME' not in prompt
+        assert result['description'].tolist() == mapped_df['description'].tolist()
+        assert result['category'].tolist() == ['Food', 'Other', 'Personal Spending', 'Utilities']
+        assert result['sub_category'].tolist() == ['Takeaway', '', 'Subscriptions', 'Internet']
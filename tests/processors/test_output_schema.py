@@ -0,0 +1,65 @@
+"""
+Tests for the enforce_output_schema decorator.
+"""
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from core.processors.abstract_processor import AbstractDataProcessor, enforce_output_schema
+
+
+@enforce_output_schema
+def passthrough(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns the given DataFrame so the decorator can be exercised directly."""
+    return df
+
+
+def test_columns_are_selected_in_standard_order():
+    """Extra columns are dropped and the standard columns are reordered."""
+    raw_df = pd.DataFrame({
+        'amount': ['-12.50', 100],
+        'category': ['Food & Dining', 'Salary'],
+        'extra': [1, 2],
+        'description': ['Cafe', 'Payroll'],
+        'sub_category': ['Restaurants', ''],
+        'transaction_date': [datetime.date(2024, 7, 10), '2024-07-11'],
+    })
+
+    result = passthrough(raw_df)
+
+    assert list(result.columns) == ['description', 'amount', 'transaction_date', 'category', 'sub_category']
+    assert pd.api.types.is_datetime64_any_dtype(result['transaction_date'])
+    assert pd.api.types.is_numeric_dtype(result['amount'])
+    assert pd.api.types.is_string_dtype(result['description'])
+    assert result['amount'].tolist() == [-12.5, 100.0]
+
+
+def test_missing_column_raises():
+    """A DataFrame without a required column is rejected."""
+    raw_df = pd.DataFrame({'description': ['Cafe'], 'amount': [-12.5]})
+
+    with pytest.raises(ValueError, match="missing required column: 'transaction_date'"):
+        passthrough(raw_df)
+
+
+def test_process_raw_data_enforces_schema_for_subclasses():
+    """Concrete processors only implement _process_impl; the schema is applied by the base class."""
+    class PassthroughProcessor(AbstractDataProcessor):
+        def _process_impl(self, df, on_progress=None):
+            return df
+
+    raw_df = pd.DataFrame({
+        'transaction_date': ['2024-07-10'],
+        'description': ['Cafe'],
+        'amount': ['-12.50'],
+        'category': ['Food & Dining'],
+        'sub_category': [''],
+        'balance': [100.0],
+    })
+
+    result = PassthroughProcessor().process_raw_data(raw_df)
+
+    assert list(result.columns) == ['description', 'amount', 'transaction_date', 'category', 'sub_category']
+    assert result['amount'].iloc[0] == -12.5
@@ -0,0 +1,46 @@
+"""
+Tests for the RuleBasedDataProcessor cleaning steps.
+"""
+
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from core.processors.rule_based_data_processor import RuleBasedDataProcessor
+
+
+@pytest.fixture
+def processor():
+    """A processor with the AI service unavailable, so only the rules run."""
+    ollama_client = MagicMock()
+    ollama_client.test_connection.return_value = False
+    return RuleBasedDataProcessor(ollama_client=ollama_client)
+
+
+def test_day_first_dates_are_parsed_day_first(processor):
+    """'03/04/2024' is read as 3 April when the rest of the column is day-first."""
+    raw_df = pd.DataFrame({
+        'Date': ['03/04/2024', '25/04/2024', '30/04/2024'],
+        'Description': ['Cafe', 'Grocery store', 'Salary credit'],
+        'Amount': ['-120.00', '-850.00', '50000.00'],
+    })
+
+    result = processor.process_raw_data(raw_df)
+
+    assert result['transaction_date'].dt.strftime('%Y-%m-%d').tolist() == [
+        '2024-04-03', '2024-04-25', '2024-04-30'
+    ]
+
+
+def test_rupee_prefixed_amounts_keep_their_value(processor):
+    """'Rs.1,200' is cleaned to 1200 rather than '.1200'."""
+    raw_df = pd.DataFrame({
+        'Date': ['2024-04-01', '2024-04-02', '2024-04-03'],
+        'Description': ['Rent', 'Refund', 'Fuel'],
+        'Amount': ['Rs.1,200', 'Rs 45.50', '(₹2,000.00)'],
+    })
+
+    result = processor.process_raw_data(raw_df)
+
+    assert result['amount'].tolist() == [1200.0, 45.5, -2000.0]